@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+checkImportTime.py: Import-time regression check for the pipeline entry points.
+
+Each entry point is imported in a fresh interpreter under `python -X importtime`. The check fails when
+the cumulative import time exceeds the module's budget, or when a heavy dependency that should only be
+loaded on first use (pdf2docx/PyMuPDF, requests) shows up at import time.
+
+Usage:
+    python3 benchmarks/checkImportTime.py [--repeat 10] [--scale 1.0]
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+# Module -> (import budget in milliseconds, modules that must not be imported eagerly).
+# Budgets sit about 1.5x above the measured times, which still catches a sizeable new eager import while
+# tolerating timing noise; use --scale on slower machines rather than raising them. Smaller regressions are
+# caught by the module lists: the job store (sqlite3) and the corpus reader (csv, mmap, tracemalloc) belong to
+# the batch and worker modes only, so main must not import them at startup.
+IMPORT_BUDGETS = {
+    "main": (55, ("pdf2docx", "fitz", "requests", "sqlite3", "csv", "mmap", "tracemalloc")),
+    "convertResumeToJson": (55, ()),
+    "validateYamlStructure": (35, ()),
+    "enhanceResumeWithAPI": (70, ("requests", "sqlite3")),
+    "generateResumeLatex": (35, ()),
+    "convertLatexToPdfDocx": (25, ("pdf2docx", "fitz")),
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_import(module):
+    """Return (cumulative microseconds, set of imported module names) for one cold import of module."""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join([SCRIPTS, ROOT, env.get("PYTHONPATH", "")])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(match.group(2))
+    return cumulative, imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry-point import times against their budgets.")
+    parser.add_argument("--repeat", type=int, default=10, help="Imports per module; the fastest is used (default: 10)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. for slow CI machines")
+    args = parser.parse_args()
+
+    failures = []
+    for module, (budget_ms, forbidden) in IMPORT_BUDGETS.items():
+        best_us = None
+        eager = set()
+        for _ in range(max(1, args.repeat)):
+            cumulative, imported = measure_import(module)
+            best_us = cumulative if best_us is None else min(best_us, cumulative)
+            eager |= imported & set(forbidden)
+        best_ms = best_us / 1000.0
+        limit_ms = budget_ms * args.scale
+        status = "ok"
+        if best_ms > limit_ms:
+            status = "OVER BUDGET"
+            failures.append(f"{module}: {best_ms:.1f} ms > {limit_ms:.0f} ms")
+        if eager:
+            status = "EAGER IMPORT"
+            failures.append(f"{module}: imports {', '.join(sorted(eager))} at startup")
+        print(f"{module:<24} {best_ms:8.1f} ms  (budget {limit_ms:.0f} ms)  {status}")
+
+    if failures:
+        print("\n❌ Import-time regressions:")
+        for failure in failures:
+            print(f" - {failure}")
+        sys.exit(1)
+    print("\n✅ All entry points are within their import-time budgets.")
+
+if __name__ == "__main__":
+    main()
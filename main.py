@@ -5,6 +5,21 @@ import yaml
 import argparse
 import sys
 import shutil
+import json
+import time
+import socket
+import threading
+from itertools import islice
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+# The job store (sqlite3), corpus streaming and file watching are imported where they are used, so each mode
+# only loads what it needs.
+
+# Stages re-run in watch mode: content edits go through the (cached) API step, template edits only recompile.
+CONTENT_STAGES = ("validate", "convert", "enhance", "latex", "compile")
+TEMPLATE_STAGES = ("latex", "compile")
 
 def load_config():
     # config.yml is located at the project root.
@@ -12,79 +27,172 @@ def load_config():
     with open(config_path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
-def main():
-    parser = argparse.ArgumentParser(description="Orchestrate the resume generation pipeline.")
-    parser.add_argument("-o", "--output", required=True, help="Base output file name (e.g., meta)")
-    args = parser.parse_args()
+def run_stage(conn, job_id, stage, cmd):
+    # Run one pipeline stage and record how long it took in the job store.
+    from manageJobStore import record_stage
+    start = time.perf_counter()
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        if conn is not None and job_id is not None:
+            record_stage(conn, job_id, stage, time.perf_counter() - start)
 
-    config = load_config()
+def start_docx(conv_script, pdf_path, workers=None):
+    # Convert an already delivered PDF to DOCX in a background process.
+    cmd = [sys.executable, conv_script, "-o", pdf_path, "--docx-only"]
+    if workers:
+        cmd += ["--docx-workers", str(workers)]
+    pending = {
+        "proc": subprocess.Popen(cmd),
+        "docx": os.path.splitext(pdf_path)[0] + ".docx",
+        "started": time.perf_counter(),
+        "finished": None,
+    }
+
+    def watch():
+        pending["proc"].wait()
+        pending["finished"] = time.perf_counter()
+        if pending["proc"].returncode == 0 and os.path.exists(pending["docx"]):
+            print(f"📝 DOCX ready: {pending['docx']}")
+
+    threading.Thread(target=watch, daemon=True).start()
+    return pending
+
+def finish_docx(conn, job_id, pending):
+    # Wait for a background DOCX conversion and record its timing and artifact.
+    from manageJobStore import record_stage, record_artifact
+    pending["proc"].wait()
+    finished = pending["finished"] or time.perf_counter()
+    if conn is not None and job_id is not None:
+        record_stage(conn, job_id, "docx", finished - pending["started"])
+    if pending["proc"].returncode == 0 and os.path.exists(pending["docx"]):
+        if conn is not None:
+            record_artifact(conn, job_id, "docx", pending["docx"])
+        return True
+    print(f"❌ DOCX conversion failed: {pending['docx']} was not created.")
+    return False
 
+def pipeline_files(base_name):
+    # Intermediate files passed from one stage to the next; they are deleted once the outputs are collected.
+    # The tailored resume can be rebuilt from the stored delta (diffResumeJson.py --materialize).
+    return {
+        "json": f"{base_name}_resume.json",
+        "tailored": f"{base_name}_tailored.json",
+    }
+
+def pipeline_outputs(base_name):
+    # Files delivered in the output folder, with the artifact kind each is indexed under.
+    return [
+        ("usage", f"{base_name}_usage.json"),
+        ("tex", f"{base_name}.tex"),
+        ("pdf", f"{base_name}.pdf"),
+        ("log", f"{base_name}.log")
+    ]
+
+def pipeline_stages(base_name, job_description_file, config, enhance_args=(), compile_args=()):
     # File paths from configuration (files are assumed under the data/ folder relative to project root)
-    resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
-    job_description_file = config.get("job_description_file", os.path.join("data", "job_description.txt"))
     latex_template = config.get("latex_template", os.path.join("data", "resume.tex"))
 
     # Load resume and template paths from config
     resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
     template_yaml = config.get("template_yaml", os.path.join("data", "template.yaml"))
 
-    # Base name and output filenames (generated in the current working directory)
-    base_name = args.output.strip()
-    json_file = f"{base_name}_resume.json"
-    tex_file = f"{base_name}.tex"
-    
+    outputs = dict(pipeline_outputs(base_name), **pipeline_files(base_name))
+    artifact_store = config.get("artifact_store", "store")
+
     # Build full paths to the helper scripts inside the "scripts" folder.
     scripts_folder = os.path.join(os.getcwd(), "scripts")
+    validate_script = os.path.join(scripts_folder, "validateYamlStructure.py")
     parse_script = os.path.join(scripts_folder, "convertResumeToJson.py")
     api_script   = os.path.join(scripts_folder, "enhanceResumeWithAPI.py")
     gen_script   = os.path.join(scripts_folder, "generateResumeLatex.py")
     conv_script  = os.path.join(scripts_folder, "convertLatexToPdfDocx.py")
-    
+
     # Use the current Python interpreter.
     python_cmd = sys.executable
 
-    # Step 0: Validate YAML structure
-    validate_script = os.path.join("scripts", "validateYamlStructure.py")
-    print("Step 0: Validating resume YAML structure...")
-    subprocess.run([
-        sys.executable, validate_script,
-        "--resume", resume_yaml,
-        "--template", template_yaml
-    ], check=True)
-
-    # Step 1: Convert YAML resume to JSON.
-    print("Step 1: Converting YAML to JSON...")
-    subprocess.run([
-        python_cmd, parse_script,
-        "--input", resume_yaml,
-        "--output", json_file
-    ], check=True)
-
-    # Step 2: Update the resume JSON using the job description (via an API call).
-    print("Step 2: Updating resume JSON with job description...")
-    subprocess.run([
-        python_cmd, api_script,
-        "--resume", json_file,
-        "--jd", job_description_file
-    ], check=True)
-
-    # Step 3: Generate the LaTeX file from the updated JSON and template.
-    print("Step 3: Generating LaTeX resume...")
-    subprocess.run([
-        python_cmd, gen_script,
-        "--json", json_file,
-        "--tex", latex_template,
-        "--output", tex_file
-    ], check=True)
-
-    # Step 4: Convert the LaTeX file to PDF and DOCX.
-    print("Step 4: Converting LaTeX to PDF and DOCX...")
-    subprocess.run([
-        python_cmd, conv_script,
-        "-o", tex_file
-    ], check=True)
-
-    # Final Step: Create a folder named after base_name and move generated files into it.
+    # (stage, progress message, command), in pipeline order.
+    return [
+        ("validate", "Validating resume YAML structure...", [
+            python_cmd, validate_script,
+            "--resume", resume_yaml,
+            "--template", template_yaml
+        ]),
+        ("convert", "Converting YAML to JSON...", [
+            python_cmd, parse_script,
+            "--input", resume_yaml,
+            "--output", outputs["json"]
+        ]),
+        ("enhance", "Updating resume JSON with job description...", [
+            python_cmd, api_script,
+            "--resume", outputs["json"],
+            "--jd", job_description_file,
+            "--output", outputs["tailored"],
+            "--store", artifact_store,
+            "--usage", outputs["usage"]
+        ] + list(enhance_args)),
+        ("latex", "Generating LaTeX resume...", [
+            python_cmd, gen_script,
+            "--json", outputs["tailored"],
+            "--tex", latex_template,
+            "--output", outputs["tex"]
+        ]),
+        # The DOCX is converted from the PDF afterwards, so the PDF is delivered as soon as xelatex finishes.
+        ("compile", "Converting LaTeX to PDF...", [
+            python_cmd, conv_script,
+            "-o", outputs["tex"],
+            "--skip-docx"
+        ] + list(compile_args)),
+    ]
+
+def stage_files(base_name, job_description_file, config):
+    # Inputs and (kind, path) outputs of the cached stages. Only the paid API step is cached: the other
+    # stages are cheap to re-run, and caching their PDFs and logs would grow the store with every job.
+    outputs = dict(pipeline_outputs(base_name), **pipeline_files(base_name))
+    return {
+        "enhance": ([outputs["json"], job_description_file],
+                    [(kind, outputs[kind]) for kind in ("tailored", "usage")]),
+    }
+
+def stage_key(stage, inputs, config):
+    from manageJobStore import hash_bytes, hash_file
+    parts = [stage] + [hash_file(path) if os.path.exists(path) else "" for path in inputs]
+    if stage == "enhance":
+        parts.append(json.dumps([config.get("model"), config.get("providers")], sort_keys=True, default=str))
+    return hash_bytes("|".join(parts).encode("utf-8"))
+
+def stage_cache_dir(config):
+    return os.path.join(config.get("artifact_store", "store"), "stages")
+
+def restore_stage(cache_dir, key, outputs):
+    # Copy a cached stage's outputs into place; False if this stage has not been run on these inputs yet.
+    entry = os.path.join(cache_dir, key)
+    if not os.path.isdir(entry):
+        return False
+    for kind, path in outputs:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(os.path.join(entry, kind), tmp_path)
+        os.replace(tmp_path, path)
+    return True
+
+def save_stage(cache_dir, key, outputs):
+    # Publish a stage's outputs under its content key; the directory rename makes the entry appear atomically.
+    entry = os.path.join(cache_dir, key)
+    if os.path.isdir(entry) or not all(os.path.exists(path) for _, path in outputs):
+        return
+    tmp_dir = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for kind, path in outputs:
+        shutil.copyfile(path, os.path.join(tmp_dir, kind))
+    try:
+        os.rename(tmp_dir, entry)
+    except OSError:
+        # Another worker cached the same stage first; its outputs are interchangeable with ours.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def collect_outputs(base_name, conn=None, job_id=None):
+    # Create a folder named after base_name and move generated files into it.
+    from manageJobStore import record_artifact
     target_folder = os.path.join(os.getcwd(), base_name)
     if not os.path.exists(target_folder):
         os.mkdir(target_folder)
@@ -92,21 +200,460 @@ def main():
     else:
         print(f"Folder {target_folder} already exists. Files will be moved into it.")
 
-    # List the files to be moved.
-    files_to_move = [
-        json_file,
-        tex_file,
-        f"{base_name}.pdf",
-        f"{base_name}.docx",
-        f"{base_name}.log"
-    ]
-
-    for file in files_to_move:
+    for kind, file in pipeline_outputs(base_name):
         if os.path.exists(file):
-            shutil.move(file, os.path.join(target_folder, file))
+            destination = os.path.join(target_folder, file)
+            shutil.move(file, destination)
             print(f"Moved {file} to {target_folder}")
+            if conn is not None:
+                record_artifact(conn, job_id, kind, destination)
+            if kind == "pdf":
+                print(f"📄 PDF ready: {destination}")
         else:
             print(f"❌ File {file} not found, cannot move.")
+    for file in pipeline_files(base_name).values():
+        if os.path.exists(file):
+            os.remove(file)
+    return target_folder
+
+def record_enhance(conn, job_id, usage_file, config):
+    # Record the API step's token usage, the provider and model that answered, and the stored delta.
+    from manageJobStore import record_usage, record_artifact
+    if conn is None or not os.path.exists(usage_file):
+        return
+    with open(usage_file, "r", encoding="utf-8") as f:
+        usage = json.load(f)
+    record_usage(conn, job_id, usage.get("usage"), usage.get("prompt_hash"), usage.get("provider"), usage.get("model"))
+    if usage.get("delta"):
+        store_dir = config.get("artifact_store", "store")
+        record_artifact(conn, job_id, "delta", os.path.join(store_dir, "deltas", f"{usage['delta']}.json"))
+
+def run_pipeline(base_name, job_description_file, config, conn=None, job_id=None, skip_docx=False,
+                 cache_dir=None, slots=None):
+    # With cache_dir, an API step whose inputs were already processed (by any run) is restored from the
+    # stage cache instead of re-run, so a re-delivered job repeats no API call. slots maps a stage name to
+    # a semaphore bounding how many jobs may run that stage at once.
+    usage_file = dict(pipeline_outputs(base_name))["usage"]
+    files = stage_files(base_name, job_description_file, config) if cache_dir else {}
+    slots = slots or {}
+    for step, (stage, message, cmd) in enumerate(pipeline_stages(base_name, job_description_file, config)):
+        print(f"Step {step}: {message}")
+        restored = False
+        if stage in files:
+            key = stage_key(stage, files[stage][0], config)
+            restored = restore_stage(cache_dir, key, files[stage][1])
+            if restored:
+                print(f"♻️ Reusing cached {stage} output ({key[:12]}) for {base_name}")
+        if not restored:
+            with slots.get(stage) or nullcontext():
+                run_stage(conn, job_id, stage, cmd)
+            if stage in files:
+                save_stage(cache_dir, key, files[stage][1])
+        if stage == "enhance":
+            # A restored API step still reports the usage and delta it was produced with.
+            record_enhance(conn, job_id, usage_file, config)
+
+    # Final Step: Move generated files into the output folder.
+    target_folder = collect_outputs(base_name, conn, job_id)
+
+    # Step 5: Convert the delivered PDF to DOCX (page-parallel) in the background.
+    pdf_path = os.path.join(target_folder, f"{base_name}.pdf")
+    if skip_docx or not os.path.exists(pdf_path):
+        return None
+    print("Step 5: Converting PDF to DOCX in the background...")
+    conv_script = os.path.join(os.getcwd(), "scripts", "convertLatexToPdfDocx.py")
+    return start_docx(conv_script, pdf_path, config.get("docx_workers"))
+
+def watch_pipeline(base_name, job_description_file, config):
+    # Rebuild the PDF whenever a data file changes, re-running only the stages the change affects.
+    from watchFiles import watch_files
+    resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
+    template_yaml = config.get("template_yaml", os.path.join("data", "template.yaml"))
+    latex_template = config.get("latex_template", os.path.join("data", "resume.tex"))
+    latex_class = config.get("latex_class", os.path.join("data", "resume.cls"))
+    content_files = [resume_yaml, template_yaml, job_description_file]
+    template_files = [latex_template, latex_class]
+
+    # The API output is cached, so a YAML edit only regenerates the sections it touched;
+    # a single xelatex pass is enough for a live preview.
+    enhance_args = ["--cache", config.get("llm_cache_file", ".llm_cache.json")]
+    compile_args = ["--passes", str(config.get("watch_xelatex_passes", 1))]
+    stages = {
+        stage: cmd
+        for stage, _, cmd in pipeline_stages(base_name, job_description_file, config, enhance_args, compile_args)
+    }
+
+    target_folder = os.path.join(os.getcwd(), base_name)
+    os.makedirs(target_folder, exist_ok=True)
+    pdf_file = f"{base_name}.pdf"
+
+    def rebuild(stage_names):
+        start = time.perf_counter()
+        for stage in stage_names:
+            try:
+                subprocess.run(stages[stage], check=True)
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Rebuild failed at stage '{stage}': {e}. Waiting for the next change...")
+                return
+        if os.path.exists(pdf_file):
+            destination = os.path.join(target_folder, pdf_file)
+            shutil.copy2(pdf_file, destination)
+            print(f"📄 PDF ready in {time.perf_counter() - start:.1f}s: {destination}")
+
+    rebuild(CONTENT_STAGES)
+    print(f"👀 Watching {', '.join(content_files + template_files)} (Ctrl+C to stop)...")
+    try:
+        for changed in watch_files(content_files + template_files,
+                                   config.get("watch_interval", 0.2), config.get("watch_debounce", 0.3)):
+            names = ", ".join(sorted(changed))
+            if changed & set(content_files):
+                print(f"✏️ Content changed ({names}): regenerating changed sections...")
+                rebuild(CONTENT_STAGES)
+            else:
+                print(f"🎨 Template changed ({names}): regenerating LaTeX and recompiling...")
+                rebuild(TEMPLATE_STAGES)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    collect_outputs(base_name)
+
+def finish_job(conn, deferred):
+    # Complete a job whose DOCX conversion was left running in the background.
+    # Returns False (and fails the job, so a resumed batch retries it) if the DOCX conversion failed.
+    from manageJobStore import mark_done, mark_failed
+    job_id, pending = deferred
+    if not finish_docx(conn, job_id, pending):
+        mark_failed(conn, job_id, f"DOCX conversion failed: {pending['docx']} was not created")
+        return False
+    mark_done(conn, job_id)
+    return True
+
+def finish_deferred(conn, deferred):
+    # Finish a batch job's background DOCX conversion, then release its spooled job description if it succeeded.
+    from streamJobDescriptions import release
+    job, jd_file, spooled = deferred
+    if not finish_job(conn, job):
+        return False
+    release(jd_file, spooled)
+    return True
+
+def run_job(conn, base_name, job_description_file, config, force=False, skip_docx=False, defer_docx=False,
+            cache_dir=None):
+    # Register the job (or find the previous run of it) and run the pipeline unless it already finished.
+    # Returns (ok, deferred): with defer_docx, a still-running DOCX conversion is handed back as deferred
+    # for the caller to pass to finish_job, so it can overlap with the next job. With cache_dir, a job
+    # retried after a failure (e.g. of its DOCX conversion) reuses its cached API output.
+    from manageJobStore import hash_file, get_or_create_job, mark_running, mark_done, mark_failed
+    latex_template = config.get("latex_template", os.path.join("data", "resume.tex"))
+    resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
+    job = get_or_create_job(
+        conn, base_name,
+        resume_hash=hash_file(resume_yaml),
+        jd_hash=hash_file(job_description_file),
+        jd_path=os.path.abspath(job_description_file),
+        template_hash=hash_file(latex_template),
+        model=config.get("model", "sonar-pro")
+    )
+    if job["status"] == "done" and not force:
+        print(f"⏭️ Skipping {base_name}: already completed.")
+        return True, None
+
+    mark_running(conn, job["id"])
+    try:
+        pending = run_pipeline(base_name, job_description_file, config, conn, job["id"], skip_docx=skip_docx,
+                               cache_dir=cache_dir)
+    except (subprocess.CalledProcessError, OSError) as e:
+        mark_failed(conn, job["id"], e)
+        print(f"❌ Job {base_name} failed: {e}")
+        return False, None
+    if pending is None:
+        mark_done(conn, job["id"])
+        return True, None
+    if defer_docx:
+        return True, (job["id"], pending)
+    return finish_job(conn, (job["id"], pending)), None
+
+def jd_spool_dir(config):
+    # Corpus records are written here one at a time for the pipeline to read, and removed after their job.
+    return os.path.join(config.get("artifact_store", "store"), "jd_spool")
+
+def default_max_pending(config, shards):
+    # Enough waiting jobs to keep every shard's API slots busy, without spooling the whole corpus up front.
+    return 4 * shards * config.get("worker_api_concurrency", 2)
+
+def enqueue_batch(conn, base_name, records, config, shards=1, force=False, max_pending=0):
+    # Coordinator: register one job per streamed job description and spread them round-robin over the shards.
+    # Jobs are written in chunks, one transaction each; with max_pending, enqueueing pauses while that many
+    # jobs wait for workers, so the queue and the spool grow only as fast as workers' API calls drain them.
+    from manageJobStore import hash_file, count_pending, enqueue_jobs
+    from streamJobDescriptions import release
+    latex_template = config.get("latex_template", os.path.join("data", "resume.tex"))
+    resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
+    resume_hash = hash_file(resume_yaml)
+    template_hash = hash_file(latex_template)
+    chunk_size = config.get("enqueue_chunk_size", 500)
+    records = iter(records)
+    total = 0
+    queued = 0
+    while True:
+        size = chunk_size
+        if max_pending:
+            # Wait for room before reading more records, so no more than max_pending are ever spooled ahead.
+            waiting = False
+            while True:
+                capacity = max_pending - count_pending(conn)
+                if capacity > 0:
+                    break
+                if not waiting:
+                    print(f"⏳ {max_pending} job(s) already waiting; pausing until workers "
+                          f"(python main.py --worker) drain the queue...")
+                    waiting = True
+                time.sleep(config.get("worker_poll_interval", 2.0))
+            size = min(chunk_size, capacity)
+        chunk = list(islice(records, size))
+        if not chunk:
+            break
+        jobs = []
+        for name, jd_file, spooled in chunk:
+            jobs.append({
+                "output_name": f"{base_name}_{name}",
+                "resume_hash": resume_hash,
+                "jd_hash": hash_file(jd_file),
+                "jd_path": os.path.abspath(jd_file),
+                "template_hash": template_hash,
+                "model": config.get("model", "sonar-pro"),
+                "shard": total % shards,
+                "spooled": spooled,
+            })
+            total += 1
+        for job, was_queued, status in enqueue_jobs(conn, jobs, force=force):
+            if was_queued:
+                queued += 1
+            elif status == "done":
+                release(job["jd_path"], job["spooled"])
+    print(f"Queued {queued} of {total} job(s) across {shards} shard(s); "
+          f"{total - queued} already completed or in progress.")
+
+def hold_lease(db_path, job_id, worker, lease_seconds, stop):
+    # Heartbeat: keep renewing the lease until the job finishes, so it is only re-delivered if this worker dies.
+    from manageJobStore import connect, renew_lease
+    conn = connect(db_path)
+    while not stop.wait(lease_seconds / 3):
+        if not renew_lease(conn, job_id, worker, lease_seconds):
+            print(f"⚠️ Lost the lease on job {job_id}; another worker may run it too.")
+            break
+    conn.close()
+
+def record_outcome(conn, job, worker, error=None):
+    # Record a claimed job's outcome, unless its lease was lost and another worker now owns the result.
+    from manageJobStore import mark_done, mark_failed
+    if error is None:
+        recorded = mark_done(conn, job["id"], worker)
+    else:
+        recorded = mark_failed(conn, job["id"], error, worker)
+    if not recorded:
+        print(f"⚠️ Lost the lease on {job['output_name']}; leaving its outcome to the worker that holds it now.")
+        return "lost"
+    return "done" if error is None else "failed"
+
+def run_claimed_job(conn, db_path, job, config, worker, slots, skip_docx=False):
+    # Run one job claimed from the queue. Returns "done", "failed", "lost" (the lease went to another
+    # worker) or "released" (this worker's inputs are out of sync, so the job went back to the queue).
+    from manageJobStore import hash_file, release_job
+    from streamJobDescriptions import release
+    resume_yaml = config.get("resume_yaml", os.path.join("data", "resume.yaml"))
+    latex_template = config.get("latex_template", os.path.join("data", "resume.tex"))
+    jd_file = job["jd_path"]
+    if (not os.path.exists(jd_file) or hash_file(jd_file) != job["jd_hash"]
+            or hash_file(resume_yaml) != job["resume_hash"] or hash_file(latex_template) != job["template_hash"]):
+        # The job itself is fine; this machine is not. Leave it for a worker whose inputs match.
+        release_job(conn, job["id"], worker)
+        print(f"⚠️ Inputs on this worker differ from the ones {job['output_name']} was queued with; "
+              f"returned it to the queue.")
+        return "released"
+
+    lease_seconds = config.get("lease_seconds", 300)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=hold_lease, args=(db_path, job["id"], worker, lease_seconds, stop), daemon=True)
+    heartbeat.start()
+    cache_dir = stage_cache_dir(config)
+    try:
+        run_pipeline(job["output_name"], jd_file, config, conn, job["id"], skip_docx=True,
+                     cache_dir=cache_dir, slots=slots)
+        if not skip_docx:
+            pdf_path = os.path.join(os.getcwd(), job["output_name"], f"{job['output_name']}.pdf")
+            conv_script = os.path.join(os.getcwd(), "scripts", "convertLatexToPdfDocx.py")
+            with slots["docx"]:
+                if not finish_docx(conn, job["id"], start_docx(conv_script, pdf_path, config.get("docx_workers"))):
+                    return record_outcome(conn, job, worker, "DOCX conversion failed")
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"❌ Job {job['output_name']} failed: {e}")
+        return record_outcome(conn, job, worker, e)
+    finally:
+        stop.set()
+    outcome = record_outcome(conn, job, worker)
+    if outcome == "done":
+        # A spooled job description is only kept until the job's artifacts are written; failed jobs keep it for a retry.
+        release(jd_file, os.path.dirname(os.path.abspath(jd_file)) == os.path.abspath(jd_spool_dir(config)))
+    return outcome
+
+def run_worker(db_path, config, shard=None, jobs=None, skip_docx=False):
+    # Worker: pull jobs from the shared queue until it is drained. API calls and CPU-bound work (xelatex,
+    # DOCX) get separate concurrency limits, so slow API calls do not leave the CPUs idle and vice versa.
+    from manageJobStore import connect, claim_job, queue_active
+    api_slots = threading.BoundedSemaphore(config.get("worker_api_concurrency", 2))
+    cpu_slots = threading.BoundedSemaphore(config.get("worker_cpu_concurrency", os.cpu_count() or 1))
+    slots = {"enhance": api_slots, "compile": cpu_slots, "docx": cpu_slots}
+    jobs = jobs or config.get("worker_api_concurrency", 2) + config.get("worker_cpu_concurrency", os.cpu_count() or 1)
+    lease_seconds = config.get("lease_seconds", 300)
+    max_attempts = config.get("max_attempts", 3)
+    poll_interval = config.get("worker_poll_interval", 2.0)
+    idle_timeout = config.get("worker_idle_timeout", 10.0)
+    results = {"done": 0, "failed": 0, "lost": 0, "released": 0}
+    results_lock = threading.Lock()
+    out_of_sync = threading.Event()
+
+    def loop(worker):
+        conn = connect(db_path)
+        idle_since = None
+        while not out_of_sync.is_set():
+            job = claim_job(conn, worker, lease_seconds, shard, max_attempts)
+            if job is None:
+                # Jobs still running elsewhere may be re-delivered here if their worker dies, and a streaming
+                # coordinator may still be adding jobs, so only stop once the queue has stayed empty for a while.
+                if queue_active(conn):
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+            idle_since = None
+            print(f"🔧 {worker} claimed {job['output_name']} (shard {job['shard']}, attempt {job['attempts']})")
+            outcome = run_claimed_job(conn, db_path, job, config, worker, slots, skip_docx)
+            with results_lock:
+                results[outcome] += 1
+            if outcome == "released":
+                # Every job would mismatch on this machine, so stop instead of cycling through the queue.
+                out_of_sync.set()
+        conn.close()
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [threading.Thread(target=loop, args=(f"{prefix}:{i}",)) for i in range(jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Worker {prefix} finished: {results['done']} done, {results['failed']} failed, "
+          f"{results['lost']} lost to another worker.")
+    if out_of_sync.is_set():
+        print("❌ This worker's resume, template or job descriptions differ from the queued jobs; "
+              "sync them with the coordinator and restart the worker.")
+    return results["failed"] == 0 and not out_of_sync.is_set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Orchestrate the resume generation pipeline.")
+    parser.add_argument("-o", "--output", help="Base output file name (e.g., meta)")
+    parser.add_argument("--batch", default=None,
+                        help="Directory of job description .txt files (one job per file, named <output>_<file stem>), "
+                             "or a .jsonl / .csv corpus with one posting per record")
+    parser.add_argument("--db", default=None, help="SQLite job store (default: job_db in config.yml, or jobs.db)")
+    parser.add_argument("--force", action="store_true", help="Re-run batch jobs that already completed")
+    parser.add_argument("--pdf-only", "--skip-docx", dest="skip_docx", action="store_true",
+                        help="Produce the PDF only; the DOCX converter (pdf2docx) is never loaded")
+    parser.add_argument("--watch", action="store_true",
+                        help="Rebuild the PDF on every change to the resume YAML, job description, or LaTeX template/class")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="With --batch: only queue the jobs for workers (coordinator) instead of running them")
+    parser.add_argument("--shards", type=int, default=1, help="Number of shards to split queued jobs over (default: 1)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="With --enqueue: pause while this many jobs wait for workers, 0 = no limit (default: "
+                             "max_pending_jobs in config.yml; otherwise 4 x shards x worker_api_concurrency for "
+                             ".jsonl/.csv corpora and no limit for directories)")
+    parser.add_argument("--worker", action="store_true", help="Run queued jobs from the job store until it is drained")
+    parser.add_argument("--shard", type=int, default=None,
+                        help="Shard this worker serves first; it takes other shards' jobs once its own are done")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Jobs a worker runs concurrently (default: worker_api_concurrency + worker_cpu_concurrency)")
+    args = parser.parse_args()
+    if not args.output and not args.worker:
+        parser.error("the following arguments are required: -o/--output")
+    if args.enqueue and not args.batch:
+        parser.error("--enqueue requires --batch")
+
+    config = load_config()
+    db_path = args.db or config.get("job_db", "jobs.db")
+
+    if args.worker:
+        ok = run_worker(db_path, config, shard=args.shard, jobs=args.jobs, skip_docx=args.skip_docx)
+        if not ok:
+            sys.exit(1)
+        return
+
+    base_name = args.output.strip()
+
+    if args.watch:
+        job_description_file = config.get("job_description_file", os.path.join("data", "job_description.txt"))
+        watch_pipeline(base_name, job_description_file, config)
+        return
+
+    from manageJobStore import connect, status_summary
+    conn = connect(db_path)
+    if not args.batch:
+        job_description_file = config.get("job_description_file", os.path.join("data", "job_description.txt"))
+        ok, _ = run_job(conn, base_name, job_description_file, config, force=True, skip_docx=args.skip_docx)
+        conn.close()
+        if not ok:
+            sys.exit(1)
+        return
+
+    # Batch mode: completed jobs are skipped, so a crashed or killed batch resumes where it stopped.
+    # Job descriptions are streamed from the source one at a time, so memory stays flat for any corpus size.
+    from streamJobDescriptions import stream_job_descriptions, is_corpus, release
+    records = stream_job_descriptions(
+        args.batch, jd_spool_dir(config),
+        config.get("corpus_text_field", "description"), config.get("corpus_id_field", "id")
+    )
+    print(f"Batch: streaming job descriptions from {args.batch}")
+    if args.enqueue:
+        max_pending = args.max_pending if args.max_pending is not None else config.get("max_pending_jobs")
+        if max_pending is None:
+            # Corpus records are spooled to disk as they are queued, so by default only a bounded number wait
+            # for workers at a time; directory sources are used in place and can be queued all at once.
+            max_pending = default_max_pending(config, max(args.shards, 1)) if is_corpus(args.batch) else 0
+        enqueue_batch(conn, base_name, records, config, shards=max(args.shards, 1), force=args.force,
+                      max_pending=max_pending)
+        conn.close()
+        return
+    total = 0
+    failed = 0
+    deferred = None
+    for name, jd_file, spooled in records:
+        total += 1
+        ok, next_deferred = run_job(conn, f"{base_name}_{name}", jd_file, config,
+                                    force=args.force, skip_docx=args.skip_docx, defer_docx=True,
+                                    cache_dir=None if args.force else stage_cache_dir(config))
+        # The previous job's DOCX was converting in the background while this job ran.
+        if deferred is not None and not finish_deferred(conn, deferred):
+            failed += 1
+        deferred = None
+        if not ok:
+            failed += 1
+        elif next_deferred is not None:
+            deferred = (next_deferred, jd_file, spooled)
+        else:
+            # A spooled job description is kept until its job succeeded; failed jobs keep it for a retry.
+            release(jd_file, spooled)
+    if deferred is not None and not finish_deferred(conn, deferred):
+        failed += 1
+
+    summary = status_summary(conn)
+    print(f"Batch: {total} job description(s) processed from {args.batch}")
+    print("Job store: " + ", ".join(f"{status}={count}" for status, count in sorted(summary.items())))
+    conn.close()
+    if failed:
+        print(f"❌ {failed} job(s) failed in this batch; re-run the same command to retry them.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
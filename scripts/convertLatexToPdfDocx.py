@@ -6,28 +6,34 @@ This script:
   - Accepts a TeX file via the -o/--output option.
   - Sets the TEXINPUTS environment variable so that xelatex can locate required class files (e.g. resume.cls in the data folder).
   - Compiles the TeX file using xelatex.
-  - Converts the resulting PDF to DOCX using pdf2docx.
+  - Converts the resulting PDF to DOCX using pdf2docx (skipped with --pdf-only / --skip-docx).
+    Multi-page PDFs are converted page-parallel across --docx-workers processes.
+
+pdf2docx pulls in PyMuPDF and friends, so it is only imported when a DOCX is actually produced.
+With --docx-only, an existing PDF is converted without compiling, so a caller can deliver the PDF as
+soon as it is compiled and produce the DOCX in the background.
 
 Usage:
-    python3 convertLatexToPdfDocx.py -o <tex_file>
+    python3 convertLatexToPdfDocx.py -o <tex_file> [--pdf-only] [--docx-workers N] [--passes N]
+    python3 convertLatexToPdfDocx.py -o <tex_or_pdf_file> --docx-only [--docx-workers N]
 Example:
     python3 convertLatexToPdfDocx.py -o meta.tex
 """
 
 import subprocess
-from pdf2docx import Converter
 import os
+import sys
 import argparse
 
-def tex_to_pdf(tex_filename):
+def tex_to_pdf(tex_filename, passes=2):
     print(f"Compiling {tex_filename} to PDF...")
     # Prepare environment so that xelatex will find resume.cls in the data folder.
     env = os.environ.copy()
     # "data//;" ensures recursive searching in the data directory.
     env["TEXINPUTS"] = "data//;" + env.get("TEXINPUTS", "")
     
-    # Run xelatex twice to resolve all references.
-    for i in range(2):
+    # Run xelatex twice (by default) to resolve all references.
+    for i in range(passes):
         print(f" - Pass {i + 1} of xelatex...")
         result = subprocess.run(
             ['xelatex', '-interaction=nonstopmode', tex_filename],
@@ -62,38 +68,64 @@ def clean_auxiliary_files(tex_filename):
         print(f"🧹 Deleted auxiliary files: {', '.join(deleted)}")
 
 
-def pdf_to_docx(pdf_file, docx_file):
+def pdf_to_docx(pdf_file, docx_file, workers=1):
     print(f"Converting {pdf_file} to {docx_file}...")
     if not os.path.exists(pdf_file):
         print(f"❌ PDF file {pdf_file} not found.")
-        return
+        return False
     try:
+        # Deferred: importing pdf2docx dominates startup for runs that never convert.
+        from pdf2docx import Converter
         cv = Converter(pdf_file)
-        cv.convert(docx_file, start=0, end=None)
+        # No point starting more processes than there are pages.
+        page_count = len(cv.fitz_doc) if hasattr(cv, "fitz_doc") else None
+        workers = min(workers, page_count) if page_count else workers
+        if workers > 1:
+            print(f" - Converting {page_count or '?'} pages across {workers} processes...")
+            cv.convert(docx_file, start=0, end=None, multi_processing=True, cpu_count=workers)
+        else:
+            cv.convert(docx_file, start=0, end=None)
         cv.close()
         if os.path.exists(docx_file):
             print(f"✅ DOCX generated: {docx_file}")
-        else:
-            print("❌ DOCX not created.")
+            return True
+        print("❌ DOCX not created.")
     except Exception as e:
         print(f"❌ Error during DOCX conversion: {e}")
+    return False
 
-def tex_to_docx(tex_file):
-    pdf_file = tex_to_pdf(tex_file)
+def tex_to_docx(tex_file, skip_docx=False, workers=1, passes=2):
+    pdf_file = tex_to_pdf(tex_file, passes)
+    if skip_docx:
+        return
     docx_file = tex_file.rsplit('.tex', 1)[0] + '.docx'
-    pdf_to_docx(pdf_file, docx_file)
+    pdf_to_docx(pdf_file, docx_file, workers)
 
 def main():
     parser = argparse.ArgumentParser(description="Convert a TeX file to PDF and DOCX.")
     parser.add_argument("-o", "--output", required=True, help="Path to the TeX file to be converted.")
+    parser.add_argument("--pdf-only", "--skip-docx", dest="skip_docx", action="store_true",
+                        help="Only compile the PDF; never load pdf2docx.")
+    parser.add_argument("--passes", type=int, default=2,
+                        help="Number of xelatex passes (default: 2; 1 is enough for quick previews).")
+    parser.add_argument("--docx-only", action="store_true",
+                        help="Convert the already compiled PDF next to -o to DOCX, without running xelatex.")
+    parser.add_argument("--docx-workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used for page-parallel DOCX conversion (default: CPU count).")
     args = parser.parse_args()
 
+    if args.docx_only:
+        base_name = os.path.splitext(args.output)[0]
+        if not pdf_to_docx(base_name + '.pdf', base_name + '.docx', args.docx_workers):
+            sys.exit(1)
+        return
+
     tex_file = args.output
     if not os.path.exists(tex_file):
         print(f"❌ TeX file not found: {tex_file}")
         return
 
-    tex_to_docx(tex_file)
+    tex_to_docx(tex_file, skip_docx=args.skip_docx, workers=args.docx_workers, passes=max(1, args.passes))
 
 if __name__ == '__main__':
     main()
@@ -2,7 +2,9 @@
 """
 convertResumeToJson.py: Converts a structured YAML resume file into a JSON formatted resume.
 If expected fields are missing, they are added with a null or empty value.
-Also normalizes phone numbers by replacing uncommon Unicode dashes with a standard hyphen.
+Also normalizes phone numbers by replacing uncommon Unicode dashes with a standard hyphen,
+and assigns a stable "id" to every work and project entry so that tailored content returned
+by the API can be merged back without matching on names.
 
 Usage:
     python3 convertResumeToJson.py --input <path_to_yaml_file> --output <path_to_json_file>
@@ -12,6 +14,7 @@ Note: Core functions remain unaltered.
 
 import os
 import json
+import hashlib
 import logging
 import argparse
 import yaml
@@ -84,6 +87,32 @@ def normalize_phone_number(phone: str) -> str:
             phone = phone.replace(uni_dash, ascii_dash)
     return phone
 
+# Fields hashed into an entry id; ids stay the same across runs as long as these do not change.
+ENTRY_ID_FIELDS = {
+    "work": ("company", "position", "start"),
+    "projects": ("name", "start"),
+}
+
+def assign_entry_ids(data):
+    for section, fields in ENTRY_ID_FIELDS.items():
+        seen = set()
+        for entry in data.get(section) or []:
+            if not isinstance(entry, dict):
+                continue
+            entry_id = entry.get("id")
+            if not entry_id:
+                key = "|".join(str(entry.get(field) or "") for field in fields)
+                entry_id = f"{section}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+            # Identical entries (e.g. two stints at the same company) get a numeric suffix.
+            base_id, suffix = str(entry_id), 2
+            entry_id = base_id
+            while entry_id in seen:
+                entry_id = f"{base_id}-{suffix}"
+                suffix += 1
+            entry["id"] = entry_id
+            seen.add(entry_id)
+    return data
+
 def load_yaml_file(file_path: str):
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -121,7 +150,9 @@ def main():
         
         if complete_data.get("basics", {}).get("phone"):
             complete_data["basics"]["phone"] = normalize_phone_number(complete_data["basics"]["phone"])
-            
+
+        assign_entry_ids(complete_data)
+
         json_output = convert_to_json(complete_data)
         with open(args.output, 'w', encoding='utf-8') as out_file:
             out_file.write(json_output)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+diffResumeJson.py: Computes and stores compact deltas between a base resume JSON and a tailored one.
+
+A delta is a JSON-Patch style list of operations (RFC 6902 "replace", "add" and "remove") covering
+only what the enhancement step may change: the summary, the highlights of each work/project entry,
+and the skills list. Work and project operations also carry the entry "id" for readability.
+
+Deltas are kept in a content-addressed store, so one base resume is shared by many tailorings:
+    <store>/objects/<sha256>.json   full base resumes
+    <store>/deltas/<sha256>.json    {"base": <sha256>, "ops": [...], "meta": {...}}
+
+Usage:
+    python3 diffResumeJson.py --base <base_json> --tailored <tailored_json> [-o <delta_json>]
+    python3 diffResumeJson.py --store <dir> --show <delta_hash>
+    python3 diffResumeJson.py --store <dir> --materialize <delta_hash> -o <resume_json>
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from copy import deepcopy
+
+DIFF_SECTIONS = ("work", "projects")
+
+def canonical_json(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def content_hash(data):
+    return hashlib.sha256(canonical_json(data).encode("utf-8")).hexdigest()
+
+def escape_pointer(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def diff_list(path, old, new):
+    ops = []
+    for i in range(min(len(old), len(new))):
+        if old[i] != new[i]:
+            ops.append({"op": "replace", "path": f"{path}/{i}", "value": new[i]})
+    for value in new[len(old):]:
+        ops.append({"op": "add", "path": f"{path}/-", "value": value})
+    # Remove from the end so earlier indexes stay valid while applying.
+    for i in range(len(old) - 1, len(new) - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{i}"})
+    return ops
+
+def make_delta(base, tailored):
+    ops = []
+    old_summary = base.get("basics", {}).get("summary")
+    new_summary = tailored.get("basics", {}).get("summary")
+    if old_summary != new_summary:
+        ops.append({"op": "replace", "path": "/basics/summary", "value": new_summary})
+
+    for section in DIFF_SECTIONS:
+        for i, (old, new) in enumerate(zip(base.get(section, []), tailored.get(section, []))):
+            if old.get("highlights") != new.get("highlights"):
+                ops.append({
+                    "op": "replace",
+                    "path": f"/{section}/{i}/highlights",
+                    "value": new.get("highlights"),
+                    "id": old.get("id"),
+                })
+
+    ops.extend(diff_list("/skills", base.get("skills") or [], tailored.get("skills") or []))
+    return ops
+
+def resolve_pointer(document, path):
+    tokens = [t.replace("~1", "/").replace("~0", "~") for t in path.lstrip("/").split("/")]
+    parent = document
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    return parent, tokens[-1]
+
+def apply_delta(base, ops):
+    document = deepcopy(base)
+    for op in ops:
+        parent, key = resolve_pointer(document, op["path"])
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                if key == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(key), op["value"])
+            elif op["op"] == "replace":
+                parent[int(key)] = op["value"]
+            elif op["op"] == "remove":
+                del parent[int(key)]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                parent[key] = op["value"]
+            elif op["op"] == "remove":
+                del parent[key]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return document
+
+def write_json_atomic(path, data, indent=None):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def store_base(store_dir, base):
+    base_hash = content_hash(base)
+    objects_dir = os.path.join(store_dir, "objects")
+    os.makedirs(objects_dir, exist_ok=True)
+    path = os.path.join(objects_dir, f"{base_hash}.json")
+    if not os.path.exists(path):
+        write_json_atomic(path, base)
+    return base_hash
+
+def store_delta(store_dir, base, ops, meta=None):
+    """Store base (once) and the delta against it; return the delta's content hash."""
+    record = {"base": store_base(store_dir, base), "ops": ops, "meta": meta or {}}
+    delta_hash = content_hash(record)
+    deltas_dir = os.path.join(store_dir, "deltas")
+    os.makedirs(deltas_dir, exist_ok=True)
+    path = os.path.join(deltas_dir, f"{delta_hash}.json")
+    if not os.path.exists(path):
+        write_json_atomic(path, record)
+    return delta_hash
+
+def load_delta(store_dir, delta_hash):
+    with open(os.path.join(store_dir, "deltas", f"{delta_hash}.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_base(store_dir, base_hash):
+    with open(os.path.join(store_dir, "objects", f"{base_hash}.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def materialize(store_dir, delta_hash):
+    record = load_delta(store_dir, delta_hash)
+    return apply_delta(load_base(store_dir, record["base"]), record["ops"])
+
+def print_delta(ops):
+    if not ops:
+        print("No changes.")
+    for op in ops:
+        label = f" ({op['id']})" if op.get("id") else ""
+        value = op.get("value")
+        if isinstance(value, list):
+            print(f"{op['op']} {op['path']}{label}:")
+            for item in value:
+                print(f"    - {item}")
+        elif op["op"] == "remove":
+            print(f"remove {op['path']}")
+        else:
+            print(f"{op['op']} {op['path']}{label}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff, store and inspect tailored resume deltas.")
+    parser.add_argument('--base', help="Path to the base resume JSON")
+    parser.add_argument('--tailored', help="Path to the tailored resume JSON")
+    parser.add_argument('--store', help="Path to the content-addressed artifact store")
+    parser.add_argument('--show', metavar="DELTA_HASH", help="Print the changes recorded in a stored delta")
+    parser.add_argument('--materialize', metavar="DELTA_HASH", help="Rebuild the full tailored resume from a stored delta")
+    parser.add_argument('-o', '--output', help="Output file (delta JSON, or resume JSON with --materialize)")
+    args = parser.parse_args()
+
+    if args.show or args.materialize:
+        if not args.store:
+            parser.error("--show and --materialize require --store")
+        if args.show:
+            print_delta(load_delta(args.store, args.show)["ops"])
+        if args.materialize:
+            resume = materialize(args.store, args.materialize)
+            if args.output:
+                write_json_atomic(args.output, resume, indent=4)
+            else:
+                print(json.dumps(resume, indent=4, ensure_ascii=False))
+        return
+
+    if not args.base or not args.tailored:
+        parser.error("--base and --tailored are required to compute a delta")
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.tailored, 'r', encoding='utf-8') as f:
+        tailored = json.load(f)
+
+    ops = make_delta(base, tailored)
+    if args.store:
+        print(f"Stored delta: {store_delta(args.store, base, ops)}")
+    if args.output:
+        write_json_atomic(args.output, {"base": content_hash(base), "ops": ops, "meta": {}}, indent=4)
+    else:
+        print_delta(ops)
+
+if __name__ == "__main__":
+    main()
@@ -2,51 +2,45 @@
 """
 enhanceResumeWithAPI.py: Updates the resume JSON by integrating data from a job description using an external API.
 This script reads a resume JSON file (generated by 1_parse_resume_yaml.py) and a job description text file,
-builds a prompt that includes the resume content and job description, sends it to the Perplexity AI API, and
-updates the resume JSON with the returned tailored content.
+builds a prompt that includes the resume content and job description, sends it to the configured LLM provider
+(Perplexity by default, see llmProviders.py), and updates the resume JSON with the returned tailored content.
+Work and project entries are matched back to the resume by their stable "id" (see mergeResumeUpdates.py).
+
+The tailored resume is written to --output (or back over --resume when --output is omitted). The changes are also
+emitted as a compact JSON-Patch style delta against the input resume: to --delta as a file, and into the
+content-addressed artifact store (--store or "artifact_store" in config.yml, see diffResumeJson.py). The stored
+delta's hash is written to --usage as "delta", so the tailored resume can be rebuilt later with
+diffResumeJson.py --materialize.
+
+With --cache, the parsed API output is cached per job description, model and provider selection. On the next run only the sections
+whose input changed (summary, skills, or individual work/project entries) are sent to the API; everything else is
+reused from the cache, and nothing is sent at all when no input changed. main.py --watch relies on this.
 
 Usage:
     python3 enhanceResumeWithAPI.py --resume <path_to_resume_json> --jd <path_to_job_description_txt>
+                                    [--output <tailored_json>] [--delta <delta_json>] [--store <dir>]
+                                    [--usage <usage_json>] [--provider <name>] [--cache <cache_json>]
 
 If --jd or --resume is not provided, the file paths will be taken from config.yml.
 """
 
-import requests
 import json
 import os
 import yaml
 import argparse
-import re
+import hashlib
+from copy import deepcopy
+
+from llmProviders import build_router, response_text
+from parseModelOutput import OUTPUT_SECTIONS, parse_model_output, build_repair_prompt, parse_repair_reply
+from diffResumeJson import make_delta, store_delta, content_hash, write_json_atomic
+from mergeResumeUpdates import merge_llm_output, print_merge_report
 
 def load_config(config_path="config.yml"):
     with open(config_path, "r", encoding="utf-8") as f:
         config = yaml.safe_load(f)
     return config
 
-def ask_perplexity(prompt, config):
-    url = config.get("endpoint", "https://api.perplexity.ai/chat/completions")
-    api_key = config.get("api_key")
-    model = config.get("model", "sonar-pro")
-    headers = {
-        'accept': 'application/json',
-        'content-type': 'application/json',
-        'Authorization': f'Bearer {api_key}'
-    }
-    data = {
-        "model": model,
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-    response = requests.post(url, headers=headers, json=data)
-    if response.ok:
-        return response.json()
-    else:
-        raise Exception(f"Request failed with status {response.status_code}: {response.text}")
-
 def read_resume(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
@@ -64,6 +58,7 @@ def extract_relevant_resume_data(file_path):
         },
         "work": [
             {
+                "id": job.get("id"),
                 "company": job["company"],
                 "highlights": job["highlights"]
             }
@@ -71,6 +66,7 @@ def extract_relevant_resume_data(file_path):
         ],
         "projects": [
             {
+                "id": project.get("id"),
                 "name": project["name"],
                 "highlights": project["highlights"]
             }
@@ -84,64 +80,42 @@ def update_resume_file(updated_resume, file_path):
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(updated_resume, f, indent=4)
 
-def main():
-    parser = argparse.ArgumentParser(description="Update resume JSON via external API based on job description.")
-    parser.add_argument('--resume', default=None, help="Path to resume JSON file created by 1_parse_resume_yaml.py")
-    parser.add_argument('--jd', default=None, help="Path to job description text file")
-    args = parser.parse_args()
-
-    # Load configuration from config.yml
-    config = load_config()
-
-    # Determine file paths from command-line arguments or config file
-    resume_file = args.resume if args.resume else config.get("resume_yaml", "resume.json")
-    jd_file = args.jd if args.jd else config.get("job_description_file", "job_description.txt")
-
-    if not os.path.exists(resume_file):
-        raise FileNotFoundError(f"Resume file not found: {resume_file}")
-    if not os.path.exists(jd_file):
-        raise FileNotFoundError(f"Job description file not found: {jd_file}")
-
-    # Extract relevant resume data and read job description text
-    my_resume = extract_relevant_resume_data(resume_file)
-    job_description = read_job_description(jd_file)
-
-    # Build the prompt variable (including the long instructions)
-    prompt = f""" You are my assistant and responsible to follow my instructions strictly. I am providing my resume content in json format in the variable "my_resume".
-    Specifically, you need to update the summary section in the json given as basics['summary'], work, projects and skills. Your goal is to enhance my resume for job applications by adding missing keywords, skills and improving the bullet points of my existing professional experience as per the job requirement given in the variable job_description.
-
-    Instructions:
-    0. You are only allowed to follow below instructions and return the final output only.
-
-    RULES FOR SUMMARY
+def build_prompt(my_resume, job_description, sections=OUTPUT_SECTIONS):
+    # Build the prompt variable (including the long instructions).
+    # With only some sections (watch mode regenerating what changed), only their rules and output fields are sent.
+    rules = {
+        "summary": """    RULES FOR SUMMARY
     1. Read the given user summary from my_resume["basics"]["summary"].
     2. Tailor this summary as per the given job_description. 
     3. Your tailored summary must include all keywords required by ATS system for the given job_description. Tailored summary must be in the range of 50-150 words only.
     4. You are only allowed to store the response in a variable "summary".
 
-    RULES FOR WORK
+""",
+        "work": """    RULES FOR WORK
     5. Read all user work experiences from `my_resume["work"]`.
-    6. This list may contain multiple work entries. Each entry includes a "company" and a list of "highlights" describing achievements and responsibilities.
+    6. This list may contain multiple work entries. Each entry includes an "id", a "company" and a list of "highlights" describing achievements and responsibilities.
     7. For each `my_resume["work"]["company"]`, generate a list of bullet points based on its "highlights", optimized using keywords from the provided `job_description`.
     8. Each bullet point must:
         - Begin with a strong action verb (e.g., Improved, Led, Developed, Designed, Automated).
         - Contain a specific, quantifiable impact (e.g., reduced cost by 25%, supported 3+ projects, served 5000+ users). If not available, infer realistic values.
         - Reference relevant skills, tools, or technologies aligned with the `job_description`.
         Be written clearly and professionally, between 15 and 30 words.
-    9. Preserve the original `my_resume["work"]["company"]` name without modification. Return the final output strictly in the following JSON format:
+    9. Preserve the original `my_resume["work"]["id"]` and `my_resume["work"]["company"]` values without modification. Return the final output strictly in the following JSON format:
     ```json
-    "work" : [{{
+    "work" : [{
+    "id": work[i]["id"],
     "company": work[i]["company"],
     "highlights": [] #Add your tailored bullet points inside this array/list.
-    }}]
+    }]
     Note - i denotes the no of work experience we are dealing, it may range from 0 to len(my_resume["work"])
 
     10. Avoid vague statements. Focus on achievements, technical contributions, and outcomes that demonstrate clear value to the employer.
 
-    RULES FOR PROJECTS
+""",
+        "projects": """    RULES FOR PROJECTS
 
     11. Read all user project entries from `my_resume["projects"]`.
-    12. This variable may include one or more projects. Each project has a "name" and a list of "highlights" describing its scope, challenges, and accomplishments.
+    12. This variable may include one or more projects. Each project has an "id", a "name" and a list of "highlights" describing its scope, challenges, and accomplishments.
     13. For each `my_resume["projects"]["name"]`, generate **exactly five** bullet points based on its corresponding "highlights", using relevant keywords and terminology from the `job_description`.
     14. Each bullet point must:
         - Begin with a **strong action verb** (e.g., Developed, Engineered, Implemented, Automated, Integrated).
@@ -149,21 +123,23 @@ def main():
         - Reference specific **technologies, tools, or frameworks** used.
         - Include at least **one measurable impact** (e.g., reduced load time by 35%, processed 1M+ data rows, improved accuracy by 12%). If metrics are not provided, infer realistic values.
         - Be clear, professional, and **concise (15–25 words max)**.
-    15. Do **not** change the value of `my_resume["projects"]["name"]`.
+    15. Do **not** change the value of `my_resume["projects"]["id"]` or `my_resume["projects"]["name"]`.
     16. Return the result **only** in the following JSON format:
 
     ```json
-    "projects" :[ {{
+    "projects" :[ {
+    "id": work[i]["id"],
     "name": work[i]["name"],
     "highlights": [] #Add your tailored bullet points inside this array/list.
-    }}]
+    }]
 
     Note - i denotes the no of work experience we are dealing, it may range from 0 to len(my_resume["projects"])
 
     17. Focus on technical contributions, engineering challenges, and results rather than general project descriptions.
     18. Avoid vague language. Ensure every point is action-driven, technically specific, and quantifiably impactful.
 
-    RULES FOR SKILLS
+""",
+        "skills": """    RULES FOR SKILLS
 
     16. Read the given user skills from `my_resume["skills"]`.
     17. Reorganize the skills into meaningful categories. Each category must be its own dictionary inside the array.
@@ -171,14 +147,41 @@ def main():
     19. Return the output strictly in the following format, using the variable name `skills`:
     
     "skills": [
-    {{
+    {
     "skill_category": "", #Add the skill category as key and skills as value in string format, seperated by comma. Example "Programming Languages": "Python, Java, JavaScript",
-    }}]
+    }]
 
     20. Do not use key names like "skill_category" or "skills". Each object in the list should use the category name as the key, and the value must be a string of skills seperated by comma (,).
     21. Do not include extra fields. The category name (e.g., "Programming Languages") and the value must be "Python, Java, Javascript".
 
-    FINAL INSTRUCTIONS
+""",
+    }
+    output_fields = {
+        "summary": ('"summary": summary', "//Add summary varible here."),
+        "work": ('"work": work', "//Add work varible here."),
+        "projects": ('"projects": projects', "//Add projects varible here."),
+        "skills": ('"skills": skills', "//Add skills variable here."),
+    }
+    sections = [section for section in OUTPUT_SECTIONS if section in sections]
+    if len(sections) == len(OUTPUT_SECTIONS):
+        scope = "Specifically, you need to update the summary section in the json given as basics['summary'], work, projects and skills."
+    else:
+        scope = (f"Specifically, you need to update only these sections: {', '.join(sections)}. "
+                 "Do not return any other section.")
+    fields = "\n".join(
+        f"        {field}{',' if i < len(sections) - 1 else ''} {comment}"
+        for i, (field, comment) in enumerate(output_fields[section] for section in sections)
+    )
+
+    prompt = f""" You are my assistant and responsible to follow my instructions strictly. I am providing my resume content in json format in the variable "my_resume".
+    {scope} Your goal is to enhance my resume for job applications by adding missing keywords, skills and improving the bullet points of my existing professional experience as per the job requirement given in the variable job_description.
+
+    Instructions:
+    0. You are only allowed to follow below instructions and return the final output only.
+
+"""
+    prompt += "".join(rules[section] for section in sections)
+    prompt += """    FINAL INSTRUCTIONS
 
     20. Content Differentiation: Ensure that the content for projects and work experience is contextualized and distinct, reflecting the unique nature of the work experience in each company. Do not repeat or reuse the same sentences across both sections. Use the provided resume details to tailore appropriately.
     21. You must strictly return the output in the following JSON structure. Do not include any additional text, explanations, or comments. Only return the output variable in the exact format specified below. Ensure the content of the fields aligns with the context of the instructions but strictly preserve the structure.
@@ -186,14 +189,9 @@ def main():
     23. - Do not add any additional fields, explanations, or comments in the JSON structure. Any output outside of the provided format will be considered invalid.
     24. - Your output must strictly match the format provided below:
 
-    "output": {{
-        "summary": summary, //Add summary varible here.
-        "work": work, //Add work varible here.
-        "projects": projects, //Add projects varible here.
-        "skills": skills //Add skills variable here.
-    }}
-
-    IMPORTANT:
+"""
+    prompt += '    "output": {\n' + fields + '\n    }\n\n'
+    prompt += f"""    IMPORTANT:
     - Return ONLY the final JSON inside a code block like ```json ... ``` without any explanations, thoughts, or commentary.
     - DO NOT include <think> tags, analysis, or any other text outside the JSON.
     - ONLY output pure JSON.
@@ -208,56 +206,205 @@ def main():
 
     --END of PROMPT--
     """
+    return prompt
 
-    # Call the external API with the prompt.
-    response = ask_perplexity(prompt, config)
+def request_tailored_output(router, prompt, my_resume, job_description, sections=OUTPUT_SECTIONS):
+    # Call the external API with the prompt, routed to the fastest healthy provider.
+    # my_resume and job_description are what the prompt was built from; repairs of a section resend its part.
+    # Only the sections the prompt asked for are expected (and repaired) in the reply.
+    response = router.complete(prompt)
 
     # Log full raw API response for debugging
-    print('Perplexity raw response:', response)
+    print('Raw API response:', response)
+
+    usage = dict(response.get("usage") or {})
+
+    # Validate structure and parse the API response in one tolerant pass.
+    content_str = response_text(response)
+    output, parse_errors = parse_model_output(content_str, my_resume)
+    parse_errors = {section: error for section, error in parse_errors.items() if section in sections}
+
+    # Only the broken sections are sent back to the model, never the whole resume. The repairs are
+    # independent of each other, so they go out together as one batch.
+    broken = list(parse_errors)
+    for section in broken:
+        print(f"⚠️ Section '{section}' is unusable ({parse_errors[section]}); requesting a targeted repair.")
+    repair_prompts = [
+        build_repair_prompt(section, content_str, parse_errors[section], my_resume, job_description)
+        for section in broken
+    ]
+    repair_responses = router.complete_batch(repair_prompts) if repair_prompts else []
+    for section, repair_response in zip(broken, repair_responses):
+        for key, value in (repair_response.get("usage") or {}).items():
+            if isinstance(value, int):
+                usage[key] = usage.get(key, 0) + value
+        repaired = parse_repair_reply(section, response_text(repair_response), my_resume)
+        if repaired is None:
+            print(f"❌ Repair of '{section}' failed; the original {section} is kept.")
+        else:
+            output[section] = repaired
+
+    if not output:
+        raise ValueError(f"Could not parse any section from the API response: {content_str}")
+    answered_by = {"provider": response.get("provider"), "model": response.get("model")}
+    return output, usage, sorted(parse_errors), answered_by
+
+def load_llm_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable API output cache {cache_path}: {e}")
+        return {}
+
+def plan_changed_sections(my_resume, cached):
+    """Compare my_resume with the input a cached output was generated for and list what must be regenerated."""
+    old_input = cached["input"]
+    old_output = cached["output"]
+    plan = {
+        "summary": my_resume["basics"]["summary"] != old_input["basics"]["summary"] or "summary" not in old_output,
+        "skills": my_resume["skills"] != old_input["skills"] or "skills" not in old_output,
+    }
+    for section in ("work", "projects"):
+        old_entries = {entry.get("id"): entry for entry in old_input.get(section, [])}
+        cached_ids = {entry.get("id") for entry in old_output.get(section, [])}
+        plan[section] = [
+            entry["id"] for entry in my_resume[section]
+            if old_entries.get(entry["id"]) != entry or entry["id"] not in cached_ids
+        ]
+    return plan
+
+def combine_with_cache(output, cached_output, plan, my_resume):
+    # Fresh output for the sections that changed, cached output for everything else.
+    combined = {}
+    for section in ("summary", "skills"):
+        value = output.get(section) if plan[section] else cached_output.get(section)
+        if value is not None:
+            combined[section] = value
+    for section in ("work", "projects"):
+        fresh = {entry.get("id"): entry for entry in output.get(section, [])}
+        cached_entries = {entry.get("id"): entry for entry in cached_output.get(section, [])}
+        entries = []
+        for entry in my_resume[section]:
+            source = fresh if entry["id"] in plan[section] else cached_entries
+            if entry["id"] in source:
+                entries.append(source[entry["id"]])
+        # Entries the model returned without an id are left to the name-based fallback of the merge.
+        entries.extend(entry for entry in output.get(section, []) if not entry.get("id"))
+        combined[section] = entries
+    return combined
+
+def main():
+    parser = argparse.ArgumentParser(description="Update resume JSON via external API based on job description.")
+    parser.add_argument('--resume', default=None, help="Path to resume JSON file created by 1_parse_resume_yaml.py")
+    parser.add_argument('--jd', default=None, help="Path to job description text file")
+    parser.add_argument('--output', default=None, help="Path for the tailored resume JSON (default: overwrite --resume)")
+    parser.add_argument('--delta', default=None, help="Path to write the delta record (as kept in the artifact store) against the input resume")
+    parser.add_argument('--store', default=None, help="Content-addressed artifact store directory (default: artifact_store in config.yml)")
+    parser.add_argument('--usage', default=None, help="Path to write the API token usage, responding provider and model, prompt hash and stored delta hash as JSON")
+    parser.add_argument('--provider', default=None, help="Use only this configured provider (\"stub\" runs offline)")
+    parser.add_argument('--cache', default=None, help="JSON cache of API output; unchanged sections are reused instead of regenerated")
+    args = parser.parse_args()
 
-    # Validate structure
-    if 'choices' not in response or not response['choices']:
-        raise ValueError(f"API call did not return expected 'choices'. Full response: {response}")
+    # Load configuration from config.yml
+    config = load_config()
 
-    
-    # Parse the API response.
-    content_str = response['choices'][0]['message'].get('content', '').strip()
+    # Determine file paths from command-line arguments or config file
+    resume_file = args.resume if args.resume else config.get("resume_yaml", "resume.json")
+    jd_file = args.jd if args.jd else config.get("job_description_file", "job_description.txt")
 
-    # Try to extract the JSON block safely
-    matches = re.findall(r'```json\s*(\{.*?\})\s*```', content_str, re.DOTALL)
+    if not os.path.exists(resume_file):
+        raise FileNotFoundError(f"Resume file not found: {resume_file}")
+    if not os.path.exists(jd_file):
+        raise FileNotFoundError(f"Job description file not found: {jd_file}")
 
-    if matches:
-        json_block = matches[0]
-        parsed_output = json.loads(json_block)
+    # Extract relevant resume data and read job description text
+    my_resume = extract_relevant_resume_data(resume_file)
+    job_description = read_job_description(jd_file)
+
+    # With --cache, only sections whose input changed since the cached run go to the API.
+    cache = load_llm_cache(args.cache) if args.cache else {}
+    # Keyed like main.py's stage cache: output from one provider (e.g. the offline stub) is never reused for another.
+    providers = json.dumps([config.get("model", "sonar-pro"), args.provider, config.get("providers")],
+                           sort_keys=True, default=str)
+    cache_key = hashlib.sha256((providers + "\n" + job_description).encode("utf-8")).hexdigest()
+    cached = cache.get(cache_key)
+    plan = plan_changed_sections(my_resume, cached) if cached else None
+
+    prompt = None
+    usage = {}
+    repaired_sections = []
+    answered_by = {"provider": None, "model": None}
+    router = build_router(config, args.provider)
+    if plan is not None and not any(plan.values()):
+        print("♻️ Resume content and job description unchanged; reusing cached API output.")
+        output = cached["output"]
     else:
-        # Fall back to original style if no triple-backtick found
-        if content_str.strip().startswith('"output":'):
-            content_str = '{' + content_str.strip() + '}'
-        
-        parsed_output = json.loads(content_str)
-        
-    summary = parsed_output['output']['summary']
-    work = parsed_output['output']['work']
-    projects = parsed_output['output']['projects']
-    skills = parsed_output['output']['skills']
-
-    # Update the original resume.json structure.
-    resume_data = read_resume(resume_file)
-    resume_data["basics"]["summary"] = summary
-
-    for updated in work:
-        for original in resume_data.get("work", []):
-            if original.get("company") == updated.get("company"):
-                original["highlights"] = updated.get("highlights")
-
-    for updated in projects:
-        for original in resume_data.get("projects", []):
-            if original.get("name") == updated.get("name"):
-                original["highlights"] = updated.get("highlights")
-
-    resume_data["skills"] = skills
-
-    update_resume_file(resume_data, resume_file)
+        request_resume = my_resume
+        sections = OUTPUT_SECTIONS
+        if plan is not None:
+            # Only the changed sections (and, for work/projects, only the changed entries) are sent,
+            # together with only their rules, so unchanged sections are not regenerated at all.
+            sections = [section for section in OUTPUT_SECTIONS if plan[section]]
+            print(f"♻️ Regenerating changed sections only: {', '.join(sections)}")
+            request_resume = {}
+            if plan["summary"]:
+                request_resume["basics"] = my_resume["basics"]
+            for section in ("work", "projects"):
+                if plan[section]:
+                    request_resume[section] = [e for e in my_resume[section] if e["id"] in plan[section]]
+            if plan["skills"]:
+                request_resume["skills"] = my_resume["skills"]
+        prompt = build_prompt(request_resume, job_description, sections)
+        output, usage, repaired_sections, answered_by = request_tailored_output(
+            router, prompt, request_resume, job_description, sections
+        )
+        print(f"Answered by {answered_by['provider']} ({answered_by['model']})")
+        if plan is not None:
+            output = combine_with_cache(output, cached["output"], plan, my_resume)
+        if router.hedging:
+            print(f"Hedging: {router.hedge_summary()}")
+
+    if args.cache:
+        cache[cache_key] = {"input": my_resume, "output": output}
+        write_json_atomic(args.cache, cache)
+
+    # Update the original resume.json structure, matching entries by their stable id.
+    base_resume = read_resume(resume_file)
+    resume_data = deepcopy(base_resume)
+    merge_report = merge_llm_output(resume_data, output)
+    print_merge_report(merge_report)
+
+    update_resume_file(resume_data, args.output or resume_file)
+
+    # Record only what changed, so the base resume can be shared across tailorings.
+    delta_ops = make_delta(base_resume, resume_data)
+    print(f"Delta: {len(delta_ops)} operation(s) against base {content_hash(base_resume)[:12]}")
+    meta = {
+        "jd_hash": hashlib.sha256(job_description.encode("utf-8")).hexdigest(),
+        "model": config.get("model", "sonar-pro"),
+    }
+    if args.delta:
+        # The same record the store keeps, so the file's content hash is the store key.
+        write_json_atomic(args.delta, {"base": content_hash(base_resume), "ops": delta_ops, "meta": meta}, indent=4)
+    delta_hash = None
+    store_dir = args.store or config.get("artifact_store")
+    if store_dir:
+        delta_hash = store_delta(store_dir, base_resume, delta_ops, meta)
+        print(f"Stored delta: {delta_hash}")
+
+    if args.usage:
+        write_json_atomic(args.usage, {
+            "usage": usage,
+            "prompt_hash": hashlib.sha256(prompt.encode("utf-8")).hexdigest() if prompt else None,
+            "repaired_sections": repaired_sections,
+            "provider": answered_by["provider"],
+            "model": answered_by["model"],
+            "hedge": router.stats,
+            "delta": delta_hash,
+        }, indent=4)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+llmProviders.py: Provider backends for the resume enhancement step.
+
+Every provider takes a prompt and returns a response in the chat-completions shape
+({"choices": [{"message": {"content": ...}}], "usage": {...}}), so enhanceResumeWithAPI.py does not care
+which backend answered. Available provider types:
+  - openai:     any OpenAI-compatible /chat/completions endpoint.
+  - perplexity: the Perplexity API (OpenAI-compatible, with Perplexity defaults).
+  - stub:       a local deterministic stand-in for offline runs and tests. It echoes the resume from the
+                prompt back unchanged in the expected "output" format, and never touches the network.
+
+Each provider enforces its own concurrency limit and request rate, and keeps a window of recent latencies.
+The limits and latencies live in a small SQLite database ("llm_state_db" in config.yml) shared by every run and
+worker process on the machine, so max_concurrency and requests_per_minute hold across processes rather than per
+run; without it they apply to the current process only. ProviderRouter tries providers in order of their
+observed p95 latency and falls back to the next one on error; providers that are currently failing are tried last.
+Every response records the provider and model that answered it under "provider" and "model".
+
+Request hedging (optional, "hedging" in config.yml): if the primary provider has not answered within its
+recent latency percentile, the same prompt is sent to the next-ranked provider (or again to the same one when
+only one is configured). The first successful response wins and the other request is cancelled: its socket is
+shut down, so it stops waiting on the server right away. Hedges are capped by a budget of extra requests
+relative to the last "window" requests of every process sharing "llm_state_db", so an idle period does not bank
+hedges for a later burst. A hedge is only sent when the backup provider has a free concurrency slot and rate
+limit turn right away; otherwise the primary is simply awaited. Latency samples are kept in "llm_state_db" too,
+so deadlines carry over between runs:
+    hedging:
+      enabled: true
+      percentile: 95      # hedge once the primary is slower than its p95
+      min_delay: 2.0      # never hedge earlier than this (seconds)
+      initial_delay: 30.0 # deadline used until min_samples latencies are known
+      min_samples: 5
+      budget: 0.1         # at most 10% extra requests...
+      burst: 1            # ...plus this many...
+      window: 100         # ...within the last 100 requests
+    llm_state_db: ".llm_state.db"
+
+Providers are configured in config.yml:
+    providers:
+      - name: perplexity
+        type: perplexity
+        api_key: "YOUR-API-KEY"
+        model: sonar-pro
+        max_concurrency: 4
+        requests_per_minute: 50
+Without a "providers" list, a single Perplexity provider is built from the top-level api_key/endpoint/model.
+
+Usage:
+    python3 llmProviders.py --provider stub --prompt-file <prompt.txt>
+"""
+
+import os
+import re
+import ast
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import yaml
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+LATENCY_WINDOW = 200
+
+# A concurrency slot still held after this long (e.g. by a process that crashed mid-request) is freed.
+SLOT_TTL = 600.0
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    provider TEXT NOT NULL,
+    holder   TEXT NOT NULL,
+    expires  REAL NOT NULL,
+    PRIMARY KEY (provider, holder)
+);
+CREATE TABLE IF NOT EXISTS rate (
+    provider        TEXT PRIMARY KEY,
+    next_request_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS latencies (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    seconds  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_latencies_provider ON latencies(provider, id);
+CREATE TABLE IF NOT EXISTS requests (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    hedged INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+class ProviderState:
+    # Concurrency slots, rate limit reservations, latency samples and the window of recent requests the hedge
+    # budget is measured over, shared through SQLite by every process
+    # that opens the same path. Each change runs in a BEGIN IMMEDIATE transaction, so processes take turns
+    # instead of overwriting each other. Without a path the state is in memory and covers this process only.
+    def __init__(self, path=None):
+        # Deferred like requests: importing sqlite3 is only paid for once a provider is built.
+        import sqlite3
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", timeout=30, isolation_level=None, check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(STATE_SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def try_acquire_slot(self, provider, limit):
+        """Take one of provider's limit slots; return its holder id, or None if all are taken."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM slots WHERE provider = ? AND expires < ?", (provider, now))
+            held = conn.execute("SELECT COUNT(*) FROM slots WHERE provider = ?", (provider,)).fetchone()[0]
+            if held >= limit:
+                return None
+            holder = f"{socket.gethostname()}:{os.getpid()}:{os.urandom(4).hex()}"
+            conn.execute("INSERT INTO slots (provider, holder, expires) VALUES (?, ?, ?)",
+                         (provider, holder, now + SLOT_TTL))
+        return holder
+
+    def release_slot(self, provider, holder):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM slots WHERE provider = ? AND holder = ?", (provider, holder))
+
+    def reserve_request(self, provider, interval, block=True):
+        """
+        Reserve provider's next request time, interval seconds after the previous one, and return how long to
+        wait for it. With block False, nothing is reserved and None is returned when a wait would be needed.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT next_request_at FROM rate WHERE provider = ?", (provider,)).fetchone()
+            start = max(now, row[0]) if row else now
+            if start > now and not block:
+                return None
+            conn.execute("INSERT OR REPLACE INTO rate (provider, next_request_at) VALUES (?, ?)",
+                         (provider, start + interval))
+        return start - now
+
+    def add_latency(self, provider, seconds):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO latencies (provider, seconds) VALUES (?, ?)", (provider, seconds))
+            conn.execute(
+                """DELETE FROM latencies WHERE provider = ? AND id <= (
+                       SELECT id FROM latencies WHERE provider = ? ORDER BY id DESC LIMIT 1 OFFSET ?)""",
+                (provider, provider, LATENCY_WINDOW)
+            )
+
+    def start_request(self, keep):
+        """Record a hedgeable request and return its id; only the latest keep requests are retained."""
+        with self.transaction() as conn:
+            request_id = conn.execute("INSERT INTO requests (hedged) VALUES (0)").lastrowid
+            conn.execute("DELETE FROM requests WHERE id <= ?", (request_id - keep,))
+        return request_id
+
+    def try_hedge(self, request_id, window, allows_hedge):
+        """
+        Mark request_id as hedged if allows_hedge(requests, hedged) permits it, counted over the latest window
+        requests of every process; returns whether it did.
+        """
+        with self.transaction() as conn:
+            requests, hedged = conn.execute(
+                """SELECT COUNT(*), COALESCE(SUM(hedged), 0) FROM (
+                       SELECT hedged FROM requests ORDER BY id DESC LIMIT ?)""",
+                (window,)
+            ).fetchone()
+            if not allows_hedge(requests, hedged):
+                return False
+            conn.execute("UPDATE requests SET hedged = 1 WHERE id = ?", (request_id,))
+        return True
+
+    def cancel_hedge(self, request_id):
+        # The hedge could not be sent after all, so it does not count against the budget.
+        with self.transaction() as conn:
+            conn.execute("UPDATE requests SET hedged = 0 WHERE id = ?", (request_id,))
+
+    def latencies(self, provider):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seconds FROM latencies WHERE provider = ? ORDER BY id DESC LIMIT ?",
+                (provider, LATENCY_WINDOW)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+class RequestCancelled(Exception):
+    pass
+
+class RequestHandle:
+    # Lets the router abort an in-flight request once another one has already won. HTTP providers attach
+    # each socket they open; cancel() shuts those sockets down, so a request blocked waiting for the server
+    # fails immediately instead of running until the server answers or the timeout expires.
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self._sockets = []
+        self._lock = threading.Lock()
+
+    def attach(self, sock):
+        with self._lock:
+            self._sockets.append(sock)
+            cancelled = self.cancelled.is_set()
+        # Cancelled while the connection was being opened: abort it before the request is sent.
+        if cancelled:
+            shutdown_socket(sock)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            sockets = list(self._sockets)
+        for sock in sockets:
+            shutdown_socket(sock)
+
+def shutdown_socket(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        # Already closed by the request finishing on its own.
+        pass
+
+def cancellable_session(requests, handle):
+    """Return a requests session whose connections attach their sockets to handle as soon as they connect."""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def tracked(connection_cls):
+        class TrackedConnection(connection_cls):
+            def connect(self):
+                super().connect()
+                handle.attach(self.sock)
+        return TrackedConnection
+
+    class TrackedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = tracked(HTTPConnection)
+
+    class TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = tracked(HTTPSConnection)
+
+    session = requests.Session()
+    for prefix in ("http://", "https://"):
+        adapter = requests.adapters.HTTPAdapter()
+        adapter.poolmanager.pool_classes_by_scheme = {
+            "http": TrackedHTTPConnectionPool,
+            "https": TrackedHTTPSConnectionPool,
+        }
+        session.mount(prefix, adapter)
+    return session
+
+class LLMProvider:
+    # True when the backend accepts several prompts in one request.
+    supports_batch = False
+
+    def __init__(self, name, max_concurrency=4, requests_per_minute=None):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        # Replaced by the router's state, which may be shared with other processes.
+        self.state = ProviderState()
+        self.failures = 0
+        self.consecutive_failures = 0
+
+    def acquire(self, block=True, handle=None):
+        """
+        Take one of this provider's concurrency slots and its turn under the rate limit. Returns the slot to
+        pass to complete(), or None when block is False and the request could not be sent right away.
+        """
+        delay = 0.01
+        while True:
+            slot = self.state.try_acquire_slot(self.name, self.max_concurrency)
+            if slot is not None:
+                break
+            if not block:
+                return None
+            if handle is not None and handle.cancelled.wait(delay):
+                raise RequestCancelled(f"{self.name}: request cancelled")
+            if handle is None:
+                time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        if self._min_interval:
+            wait = self.state.reserve_request(self.name, self._min_interval, block)
+            if wait is None:
+                self.release(slot)
+                return None
+            if handle is not None and handle.cancelled.wait(wait):
+                self.release(slot)
+                raise RequestCancelled(f"{self.name}: request cancelled")
+            if handle is None and wait > 0:
+                time.sleep(wait)
+        return slot
+
+    def release(self, slot):
+        self.state.release_slot(self.name, slot)
+
+    def _send(self, prompt, handle=None):
+        raise NotImplementedError
+
+    def _send_batch(self, prompts):
+        raise NotImplementedError
+
+    def complete(self, prompt, handle=None, slot=None):
+        # slot is one already taken with acquire(); otherwise complete() waits for one.
+        if slot is None:
+            slot = self.acquire(handle=handle)
+        try:
+            if handle is not None and handle.cancelled.is_set():
+                raise RequestCancelled(f"{self.name}: request cancelled")
+            start = time.perf_counter()
+            try:
+                response = self._send(prompt, handle)
+            except RequestCancelled:
+                # The request lost a hedge race: its elapsed time is a lower bound on its latency.
+                self.state.add_latency(self.name, time.perf_counter() - start)
+                raise
+            except Exception:
+                self.failures += 1
+                self.consecutive_failures += 1
+                raise
+            self.consecutive_failures = 0
+            self.state.add_latency(self.name, time.perf_counter() - start)
+            response.setdefault("provider", self.name)
+            response.setdefault("model", getattr(self, "model", None))
+            return response
+        finally:
+            self.release(slot)
+
+    def complete_batch(self, prompts):
+        prompts = list(prompts)
+        if self.supports_batch:
+            return self._send_batch(prompts)
+        # No native batching: fan out, bounded by this provider's concurrency limit.
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(1, len(prompts)))) as pool:
+            return list(pool.map(self.complete, prompts))
+
+    def latency_samples(self):
+        return self.state.latencies(self.name)
+
+    def latency_percentile(self, pct):
+        """Return the pct-th percentile of recent latencies in seconds, or None without samples."""
+        samples = sorted(self.latency_samples())
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+class OpenAICompatibleProvider(LLMProvider):
+    default_endpoint = "https://api.openai.com/v1/chat/completions"
+    default_model = "gpt-4o-mini"
+
+    def __init__(self, name, api_key=None, endpoint=None, model=None, timeout=120, **limits):
+        super().__init__(name, **limits)
+        self.api_key = api_key
+        self.endpoint = endpoint or self.default_endpoint
+        self.model = model or self.default_model
+        self.timeout = timeout
+
+    def build_request(self, prompt):
+        headers = {
+            'accept': 'application/json',
+            'content-type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        data = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+        return headers, data
+
+    def _send(self, prompt, handle=None):
+        # Deferred so runs that only use the stub (or never reach the API) skip importing requests.
+        import requests
+
+        headers, data = self.build_request(prompt)
+        # A session per request, so a hedged loser's connection belongs to it alone and can be shut down.
+        session = cancellable_session(requests, handle) if handle is not None else requests.Session()
+        if handle is not None and handle.cancelled.is_set():
+            session.close()
+            raise RequestCancelled(f"{self.name}: request cancelled")
+        try:
+            response = session.post(self.endpoint, headers=headers, json=data, timeout=self.timeout)
+        except Exception as e:
+            if handle is not None and handle.cancelled.is_set():
+                raise RequestCancelled(f"{self.name}: request cancelled") from e
+            raise
+        finally:
+            session.close()
+        if response.ok:
+            return response.json()
+        raise Exception(f"{self.name}: request failed with status {response.status_code}: {response.text}")
+
+class PerplexityProvider(OpenAICompatibleProvider):
+    default_endpoint = "https://api.perplexity.ai/chat/completions"
+    default_model = "sonar-pro"
+
+class LocalStubProvider(LLMProvider):
+    supports_batch = True
+
+    def __init__(self, name="stub", latency=0.0, **limits):
+        super().__init__(name, **limits)
+        self.latency = float(latency)
+
+    def _send(self, prompt, handle=None):
+        if self.latency:
+            if handle is None:
+                time.sleep(self.latency)
+            elif handle.cancelled.wait(self.latency):
+                raise RequestCancelled(f"{self.name}: request cancelled")
+        return stub_response(prompt)
+
+    def _send_batch(self, prompts):
+        return [self.complete(prompt) for prompt in prompts]
+
+def stub_response(prompt):
+    # The prompt embeds the extracted resume as a Python literal on the "my_resume = {...}" line.
+    match = re.search(r"^\s*my_resume = (\{.*\})\s*$", prompt, re.MULTILINE)
+    my_resume = ast.literal_eval(match.group(1)) if match else {}
+    output = {
+        "summary": my_resume.get("basics", {}).get("summary", ""),
+        "work": my_resume.get("work", []),
+        "projects": my_resume.get("projects", []),
+        "skills": my_resume.get("skills", []),
+    }
+    content = "```json\n" + json.dumps({"output": output}, indent=2) + "\n```"
+    return {
+        "model": "stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                  "total_tokens": len(prompt.split()) + len(content.split())},
+    }
+
+PROVIDER_TYPES = {
+    "openai": OpenAICompatibleProvider,
+    "perplexity": PerplexityProvider,
+    "stub": LocalStubProvider,
+}
+
+def build_provider(spec):
+    spec = dict(spec)
+    provider_type = spec.pop("type", "perplexity")
+    if provider_type not in PROVIDER_TYPES:
+        raise ValueError(f"Unknown provider type '{provider_type}'. Expected one of: {', '.join(PROVIDER_TYPES)}")
+    name = spec.pop("name", provider_type)
+    return PROVIDER_TYPES[provider_type](name, **spec)
+
+def build_providers(config):
+    specs = config.get("providers")
+    if not specs:
+        specs = [{
+            "name": "perplexity",
+            "type": "perplexity",
+            "api_key": config.get("api_key"),
+            "endpoint": config.get("endpoint"),
+            "model": config.get("model", "sonar-pro"),
+        }]
+    return [build_provider(spec) for spec in specs]
+
+class HedgePolicy:
+    def __init__(self, enabled=True, percentile=95, min_delay=2.0, initial_delay=30.0, min_samples=5,
+                 budget=0.1, burst=1, window=100):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = float(min_delay)
+        self.initial_delay = float(initial_delay)
+        self.min_samples = int(min_samples)
+        self.budget = float(budget)
+        self.burst = int(burst)
+        self.window = max(1, int(window))
+
+    def deadline(self, provider):
+        """Seconds to wait for provider before hedging."""
+        if len(provider.latency_samples()) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        return max(self.min_delay, provider.latency_percentile(self.percentile))
+
+    def allows_hedge(self, requests, hedged):
+        """True if one more hedge fits the budget, given the requests and hedges in the current window."""
+        return hedged < self.burst + self.budget * requests
+
+class ProviderRouter:
+    def __init__(self, providers, hedging=None, state=None):
+        if not providers:
+            raise ValueError("At least one provider is required.")
+        self.providers = list(providers)
+        self.hedging = HedgePolicy(**hedging) if hedging and hedging.get("enabled", True) else None
+        self.state = state or ProviderState()
+        for provider in self.providers:
+            provider.state = self.state
+        # Counters for this process's requests, reported with each run; the budget itself uses the shared window.
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "hedges_over_budget": 0, "hedges_unavailable": 0}
+
+    def ranked(self):
+        # Providers that keep failing sink to the back. Providers without latency samples keep their
+        # configured order ahead of measured ones, so each gets probed before routing settles on the fastest.
+        def key(item):
+            position, provider = item
+            p95 = provider.latency_percentile(95)
+            return (provider.consecutive_failures, p95 is not None, p95 or 0.0, position)
+        return [provider for _, provider in sorted(enumerate(self.providers), key=key)]
+
+    def complete(self, prompt):
+        self.stats["requests"] += 1
+        if self.hedging:
+            return self._complete_hedged(prompt, self.state.start_request(self.hedging.window))
+        return self._complete_in_order(prompt, self.ranked())
+
+    def _complete_in_order(self, prompt, providers, errors=None):
+        errors = errors or []
+        for provider in providers:
+            try:
+                return provider.complete(prompt)
+            except Exception as e:
+                print(f"⚠️ Provider {provider.name} failed: {e}")
+                errors.append(f"{provider.name}: {e}")
+        raise Exception("All providers failed: " + "; ".join(errors))
+
+    def _complete_hedged(self, prompt, request_id):
+        ranked = self.ranked()
+        primary = ranked[0]
+        backup = ranked[1] if len(ranked) > 1 else primary
+        results = queue.Queue()
+        handles = {}
+
+        def launch(role, provider, slot=None):
+            handle = RequestHandle()
+            handles[role] = (provider, handle)
+
+            def run():
+                try:
+                    results.put((role, provider.complete(prompt, handle, slot), None))
+                except Exception as e:
+                    results.put((role, None, e))
+            # Daemon threads: a cancelled loser must never keep the process alive.
+            threading.Thread(target=run, name=f"llm-{role}", daemon=True).start()
+
+        deadline = self.hedging.deadline(primary)
+        launch("primary", primary)
+        try:
+            outcome = results.get(timeout=deadline)
+        except queue.Empty:
+            outcome = None
+            if not self.state.try_hedge(request_id, self.hedging.window, self.hedging.allows_hedge):
+                self.stats["hedges_over_budget"] += 1
+            else:
+                # A hedge that would queue for a slot or a rate limit turn (e.g. behind the primary itself on a
+                # single provider with max_concurrency 1) cannot beat the primary, so it is not sent or counted.
+                slot = backup.acquire(block=False)
+                if slot is None:
+                    self.state.cancel_hedge(request_id)
+                    self.stats["hedges_unavailable"] += 1
+                else:
+                    self.stats["hedged"] += 1
+                    print(f"⏱️ No response from {primary.name} after {deadline:.1f}s, hedging to {backup.name}.")
+                    launch("hedge", backup, slot)
+
+        errors = []
+        pending = len(handles)
+        while pending:
+            role, response, error = outcome if outcome is not None else results.get()
+            outcome = None
+            pending -= 1
+            if error is None:
+                for other_role, (_, handle) in handles.items():
+                    if other_role != role:
+                        handle.cancel()
+                if role == "hedge":
+                    self.stats["hedge_wins"] += 1
+                return response
+            provider = handles[role][0]
+            print(f"⚠️ Provider {provider.name} failed: {error}")
+            errors.append(f"{provider.name}: {error}")
+
+        # Every in-flight attempt failed: fall back to the remaining providers one at a time.
+        tried = {provider.name for provider, _ in handles.values()}
+        return self._complete_in_order(prompt, [p for p in ranked if p.name not in tried], errors)
+
+    def complete_batch(self, prompts):
+        # Independent prompts go to one provider together (natively batched where supported), falling back
+        # to the next-ranked provider if that fails. Batched requests are not hedged.
+        prompts = list(prompts)
+        errors = []
+        for provider in self.ranked():
+            try:
+                return provider.complete_batch(prompts)
+            except Exception as e:
+                print(f"⚠️ Provider {provider.name} failed: {e}")
+                errors.append(f"{provider.name}: {e}")
+        raise Exception("All providers failed: " + "; ".join(errors))
+
+    def hedge_summary(self):
+        stats = self.stats
+        rate = stats["hedged"] / stats["requests"] if stats["requests"] else 0.0
+        return (f"requests={stats['requests']} hedged={stats['hedged']} ({rate:.1%}) "
+                f"hedge_wins={stats['hedge_wins']} over_budget={stats['hedges_over_budget']} "
+                f"unavailable={stats['hedges_unavailable']}")
+
+def build_router(config, provider_name=None):
+    """Build a router over the configured providers, or over a single provider selected by name."""
+    providers = build_providers(config)
+    if provider_name:
+        selected = [p for p in providers if p.name == provider_name]
+        if not selected and provider_name == "stub":
+            selected = [LocalStubProvider()]
+        if not selected:
+            raise ValueError(f"Provider '{provider_name}' is not configured.")
+        providers = selected
+    state = ProviderState(config["llm_state_db"]) if config.get("llm_state_db") else None
+    return ProviderRouter(providers, config.get("hedging"), state)
+
+def response_text(response):
+    if 'choices' not in response or not response['choices']:
+        raise ValueError(f"API call did not return expected 'choices'. Full response: {response}")
+    return response['choices'][0]['message'].get('content', '').strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a prompt through the configured LLM providers.")
+    parser.add_argument('--config', default="config.yml", help="Path to config.yml")
+    parser.add_argument('--provider', default=None, help="Use only this provider (\"stub\" is always available)")
+    parser.add_argument('--prompt-file', required=True, help="Path to a text file holding the prompt")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    with open(args.prompt_file, "r", encoding="utf-8") as f:
+        prompt = f.read()
+
+    router = build_router(config, args.provider)
+    response = router.complete(prompt)
+    print(response_text(response))
+    print(f"Answered by {response['provider']} ({response['model']})")
+    if router.hedging:
+        print(f"Hedging: {router.hedge_summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+manageJobStore.py: SQLite-backed record of pipeline runs and the artifacts they produced.
+
+Every run of main.py is stored as a job keyed by the content hashes of its inputs (resume YAML, job
+description, LaTeX template) and the model, together with its status, per-stage timings, token usage
+and artifact paths. Batch runs use the store to restart only the jobs that did not finish, and the
+artifact index answers questions like "all PDFs for this JD" without walking output folders.
+
+The jobs table also serves as the shared queue for distributed batches: a coordinator enqueues pending jobs
+split across shards, and workers claim them under a time-limited lease that they keep renewing while the
+job runs. A worker that dies simply stops renewing, so its job is handed to another worker once the lease
+expires (at-least-once delivery).
+
+Usage:
+    python3 manageJobStore.py --db jobs.db --summary
+    python3 manageJobStore.py --db jobs.db --jd data/job_description.txt --kind pdf
+    python3 manageJobStore.py --db jobs.db --status failed
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+
+JOB_STATUSES = ("pending", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key           TEXT NOT NULL UNIQUE,
+    output_name       TEXT NOT NULL,
+    resume_hash       TEXT NOT NULL,
+    jd_hash           TEXT NOT NULL,
+    jd_path           TEXT,
+    template_hash     TEXT,
+    model             TEXT,
+    prompt_hash       TEXT,
+    status            TEXT NOT NULL DEFAULT 'pending',
+    stage_timings     TEXT NOT NULL DEFAULT '{}',
+    prompt_tokens     INTEGER,
+    completion_tokens INTEGER,
+    total_tokens      INTEGER,
+    error             TEXT,
+    created_at        REAL NOT NULL,
+    started_at        REAL,
+    finished_at       REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_jd_hash ON jobs(jd_hash);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    kind   TEXT NOT NULL,
+    path   TEXT NOT NULL,
+    PRIMARY KEY (job_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_kind ON artifacts(kind);
+"""
+
+# Queue columns, added to job stores created before distributed batches existed.
+QUEUE_COLUMNS = {
+    "shard": "INTEGER",
+    "worker": "TEXT",
+    "lease_expires": "REAL",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# The provider and model that actually answered the API step ("model" is the configured one the job was keyed by).
+RESPONSE_COLUMNS = {
+    "provider": "TEXT",
+    "response_model": "TEXT",
+}
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers query the index while a batch is writing to it.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    with conn:
+        for column, definition in {**QUEUE_COLUMNS, **RESPONSE_COLUMNS}.items():
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, shard)")
+    return conn
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_job_key(resume_hash, jd_hash, template_hash, model, output_name):
+    return hash_bytes("|".join([resume_hash, jd_hash, template_hash or "", model or "", output_name]).encode("utf-8"))
+
+def get_or_create_job(conn, output_name, resume_hash, jd_hash, jd_path=None, template_hash=None, model=None):
+    """Return the job row for these inputs, creating a pending job if it does not exist yet."""
+    job_key = make_job_key(resume_hash, jd_hash, template_hash, model, output_name)
+    with conn:
+        conn.execute(
+            """INSERT OR IGNORE INTO jobs
+               (job_key, output_name, resume_hash, jd_hash, jd_path, template_hash, model, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (job_key, output_name, resume_hash, jd_hash, jd_path, template_hash, model, time.time())
+        )
+    return conn.execute("SELECT * FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+
+def mark_running(conn, job_id):
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'running', started_at = ?, finished_at = NULL, error = NULL WHERE id = ?",
+            (time.time(), job_id)
+        )
+
+def owner_condition(worker):
+    # Queue workers may only record the outcome of a job they still hold the lease on.
+    if worker is None:
+        return "", ()
+    return " AND worker = ? AND status = 'running'", (worker,)
+
+def mark_done(conn, job_id, worker=None):
+    """Mark a job done. With worker, only if that worker still holds it; returns False if it did not."""
+    condition, params = owner_condition(worker)
+    with conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ? WHERE id = ?" + condition,
+            (time.time(), job_id) + params
+        )
+    return cursor.rowcount == 1
+
+def mark_failed(conn, job_id, error, worker=None):
+    """Mark a job failed. With worker, only if that worker still holds it; returns False if it did not."""
+    condition, params = owner_condition(worker)
+    with conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?" + condition,
+            (time.time(), str(error), job_id) + params
+        )
+    return cursor.rowcount == 1
+
+def record_stage(conn, job_id, stage, seconds):
+    row = conn.execute("SELECT stage_timings FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    timings = json.loads(row["stage_timings"]) if row else {}
+    timings[stage] = round(seconds, 3)
+    with conn:
+        conn.execute("UPDATE jobs SET stage_timings = ? WHERE id = ?", (json.dumps(timings), job_id))
+
+def record_usage(conn, job_id, usage, prompt_hash=None, provider=None, response_model=None):
+    usage = usage or {}
+    with conn:
+        conn.execute(
+            """UPDATE jobs SET prompt_tokens = ?, completion_tokens = ?, total_tokens = ?,
+               prompt_hash = COALESCE(?, prompt_hash), provider = COALESCE(?, provider),
+               response_model = COALESCE(?, response_model) WHERE id = ?""",
+            (usage.get("prompt_tokens"), usage.get("completion_tokens"), usage.get("total_tokens"),
+             prompt_hash, provider, response_model, job_id)
+        )
+
+def record_artifact(conn, job_id, kind, path):
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO artifacts (job_id, kind, path) VALUES (?, ?, ?)",
+            (job_id, kind, os.path.abspath(path))
+        )
+
+def find_artifacts(conn, jd_hash=None, kind=None, status="done"):
+    query = """SELECT jobs.output_name, jobs.jd_hash, jobs.model, artifacts.kind, artifacts.path
+               FROM artifacts JOIN jobs ON jobs.id = artifacts.job_id WHERE 1 = 1"""
+    params = []
+    if jd_hash:
+        query += " AND jobs.jd_hash = ?"
+        params.append(jd_hash)
+    if kind:
+        query += " AND artifacts.kind = ?"
+        params.append(kind)
+    if status:
+        query += " AND jobs.status = ?"
+        params.append(status)
+    return conn.execute(query + " ORDER BY jobs.id", params).fetchall()
+
+def jobs_by_status(conn, status):
+    return conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)).fetchall()
+
+def enqueue_jobs(conn, jobs, force=False):
+    """
+    Register a chunk of jobs in one transaction and make them claimable by workers. Each job is a dict
+    with the get_or_create_job fields plus its shard. Completed jobs are left alone unless force is set,
+    and jobs currently held by a worker are never taken away from it.
+    Returns one (job, queued, status) tuple per job, where status is the job's status after the call.
+    """
+    condition = "status != 'running'" if force else "status IN ('pending', 'failed')"
+    results = []
+    with conn:
+        for job in jobs:
+            job_key = make_job_key(job["resume_hash"], job["jd_hash"], job.get("template_hash"),
+                                   job.get("model"), job["output_name"])
+            conn.execute(
+                """INSERT OR IGNORE INTO jobs
+                   (job_key, output_name, resume_hash, jd_hash, jd_path, template_hash, model, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_key, job["output_name"], job["resume_hash"], job["jd_hash"], job.get("jd_path"),
+                 job.get("template_hash"), job.get("model"), time.time())
+            )
+            cursor = conn.execute(
+                f"""UPDATE jobs SET status = 'pending', shard = ?, jd_path = COALESCE(?, jd_path), worker = NULL,
+                    lease_expires = NULL, attempts = 0, error = NULL WHERE job_key = ? AND {condition}""",
+                (job["shard"], job.get("jd_path"), job_key)
+            )
+            status = conn.execute("SELECT status FROM jobs WHERE job_key = ?", (job_key,)).fetchone()["status"]
+            results.append((job, cursor.rowcount == 1, status))
+    return results
+
+def expire_leases(conn, max_attempts):
+    """Fail jobs whose lease expired after max_attempts claims, so a job that keeps killing workers stops."""
+    with conn:
+        conn.execute(
+            """UPDATE jobs SET status = 'failed', finished_at = ?,
+               error = 'lease expired after ' || attempts || ' attempt(s)'
+               WHERE status = 'running' AND lease_expires < ? AND attempts >= ?""",
+            (time.time(), time.time(), max_attempts)
+        )
+
+def claim_job(conn, worker, lease_seconds, shard=None, max_attempts=3):
+    """
+    Claim the next pending job (or a running job whose lease expired) for worker and return its row,
+    or None if nothing is claimable. Jobs from the worker's own shard are taken first; other shards are
+    drained afterwards so a fast worker does not sit idle.
+    """
+    expire_leases(conn, max_attempts)
+    while True:
+        now = time.time()
+        row = conn.execute(
+            """SELECT id FROM jobs
+               WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?)
+               ORDER BY (shard IS ?) DESC, id LIMIT 1""",
+            (now, shard)
+        ).fetchone()
+        if row is None:
+            return None
+        # Another worker may claim the same row between the SELECT and the UPDATE; only one UPDATE matches.
+        with conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1,
+                   started_at = ?, finished_at = NULL, error = NULL
+                   WHERE id = ? AND (status = 'pending' OR (status = 'running' AND lease_expires < ?))""",
+                (worker, now + lease_seconds, now, row["id"], now)
+            )
+        if cursor.rowcount == 1:
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+
+def renew_lease(conn, job_id, worker, lease_seconds):
+    """Extend worker's lease on a running job. Returns False if the lease was lost to another worker."""
+    with conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease_seconds, job_id, worker)
+        )
+    return cursor.rowcount == 1
+
+def release_job(conn, job_id, worker):
+    """Hand a claimed job back to the queue untouched, without counting the claim as an attempt."""
+    with conn:
+        cursor = conn.execute(
+            """UPDATE jobs SET status = 'pending', worker = NULL, lease_expires = NULL, started_at = NULL,
+               attempts = MAX(attempts - 1, 0) WHERE id = ? AND worker = ? AND status = 'running'""",
+            (job_id, worker)
+        )
+    return cursor.rowcount == 1
+
+def queue_active(conn):
+    """True while any job is pending or running, i.e. workers may still have something to pick up."""
+    row = conn.execute("SELECT COUNT(*) AS n FROM jobs WHERE status IN ('pending', 'running')").fetchone()
+    return row["n"] > 0
+
+def count_pending(conn):
+    # Served from idx_jobs_status, so polling it stays cheap however many jobs the store holds.
+    return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+
+def status_summary(conn):
+    rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    return {row["status"]: row["n"] for row in rows}
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the pipeline job store.")
+    parser.add_argument('--db', default="jobs.db", help="Path to the SQLite job store (default: jobs.db)")
+    parser.add_argument('--summary', action="store_true", help="Print the number of jobs per status")
+    parser.add_argument('--status', choices=JOB_STATUSES, help="List jobs with this status")
+    parser.add_argument('--jd', help="Job description file or its sha256 hash to list artifacts for")
+    parser.add_argument('--kind', help="Artifact kind to list (e.g. pdf, docx, tex, json)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Job store not found: {args.db}")
+        return
+
+    conn = connect(args.db)
+    if args.summary:
+        for status, count in sorted(status_summary(conn).items()):
+            print(f"{status}: {count}")
+    if args.status:
+        for row in jobs_by_status(conn, args.status):
+            error = f" ({row['error']})" if row["error"] else ""
+            answered = f"  answered_by={row['provider']}/{row['response_model']}" if row["provider"] else ""
+            print(f"{row['output_name']}  jd={row['jd_hash'][:12]}  model={row['model']}{answered}{error}")
+    if args.jd or args.kind:
+        jd_hash = hash_file(args.jd) if args.jd and os.path.exists(args.jd) else args.jd
+        for row in find_artifacts(conn, jd_hash=jd_hash, kind=args.kind):
+            print(row["path"])
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+mergeResumeUpdates.py: Merges the tailored content returned by the API back into the resume JSON.
+
+Work and project entries are indexed once by the stable "id" assigned in convertResumeToJson.py,
+so every returned entry is applied in constant time instead of rescanning the whole section.
+Entries returned without an id fall back to a name match, but only when that name is unique in
+the resume; ambiguous names are reported instead of being applied to the wrong entry.
+
+The merge returns a report per section:
+  - updated:      ids of resume entries that received new highlights.
+  - unmatched:    ids of resume entries the API did not return (left unchanged).
+  - dropped:      returned entries that matched but were unusable (no highlights, or a duplicate).
+  - hallucinated: returned entries that match nothing in the resume.
+
+Usage:
+    python3 mergeResumeUpdates.py --resume <path_to_resume_json> --updates <path_to_api_output_json>
+"""
+
+import json
+import argparse
+
+# Section name -> field used as a fallback when the API omits the entry id.
+SECTION_NAME_FIELDS = {
+    "work": "company",
+    "projects": "name",
+}
+
+def text_field(entry, field):
+    """
+    Return entry[field] as a string, or None when it is missing or empty. Model output may carry numbers
+    (coerced to text) or lists/objects (rejected) where ids and names should be strings.
+    """
+    value = entry.get(field)
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        value = str(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value
+
+def index_entries(entries, name_field):
+    by_id = {}
+    by_name = {}
+    for entry in entries:
+        entry_id = text_field(entry, "id")
+        if entry_id:
+            by_id[entry_id] = entry
+        by_name.setdefault(text_field(entry, name_field), []).append(entry)
+    return by_id, by_name
+
+def describe_entry(entry, name_field):
+    if not isinstance(entry, dict):
+        return repr(entry)
+    described = text_field(entry, "id") or text_field(entry, name_field)
+    if described:
+        return described
+    return repr(entry["id"]) if entry.get("id") is not None else "<unnamed>"
+
+def merge_section(originals, updates, name_field):
+    by_id, by_name = index_entries(originals, name_field)
+    report = {"updated": [], "unmatched": [], "dropped": [], "hallucinated": []}
+    applied = set()
+
+    for updated in updates or []:
+        if not isinstance(updated, dict):
+            report["dropped"].append(describe_entry(updated, name_field))
+            continue
+
+        if updated.get("id") is not None and text_field(updated, "id") is None:
+            # An id that is a list or an object cannot identify anything.
+            report["dropped"].append(describe_entry(updated, name_field))
+            continue
+        original = by_id.get(text_field(updated, "id"))
+        if original is None and not text_field(updated, "id"):
+            candidates = by_name.get(text_field(updated, name_field), [])
+            if len(candidates) == 1:
+                original = candidates[0]
+            elif len(candidates) > 1:
+                # Same name on several entries and no id: refuse to guess.
+                report["dropped"].append(describe_entry(updated, name_field))
+                continue
+
+        if original is None:
+            report["hallucinated"].append(describe_entry(updated, name_field))
+            continue
+
+        key = id(original)
+        highlights = updated.get("highlights")
+        if key in applied or not isinstance(highlights, list) or not highlights:
+            report["dropped"].append(describe_entry(updated, name_field))
+            continue
+
+        original["highlights"] = highlights
+        applied.add(key)
+        report["updated"].append(describe_entry(original, name_field))
+
+    for original in originals:
+        if id(original) not in applied:
+            report["unmatched"].append(describe_entry(original, name_field))
+    return report
+
+def merge_llm_output(resume_data, output):
+    """Apply the parsed API "output" object to resume_data in place and return the merge report."""
+    report = {}
+    if output.get("summary"):
+        resume_data["basics"]["summary"] = output["summary"]
+    for section, name_field in SECTION_NAME_FIELDS.items():
+        report[section] = merge_section(resume_data.get(section, []), output.get(section), name_field)
+    if output.get("skills"):
+        resume_data["skills"] = output["skills"]
+    return report
+
+def print_merge_report(report):
+    for section, details in report.items():
+        print(f"{section}: {len(details['updated'])} updated")
+        for kind in ("unmatched", "dropped", "hallucinated"):
+            if details[kind]:
+                print(f"⚠️ {section} {kind}: {', '.join(details[kind])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge tailored API output back into a resume JSON file.")
+    parser.add_argument('--resume', required=True, help="Path to resume JSON file (updated in place)")
+    parser.add_argument('--updates', required=True, help="Path to JSON file holding the API \"output\" object")
+    args = parser.parse_args()
+
+    with open(args.resume, 'r', encoding='utf-8') as f:
+        resume_data = json.load(f)
+    with open(args.updates, 'r', encoding='utf-8') as f:
+        updates = json.load(f)
+
+    report = merge_llm_output(resume_data, updates.get("output", updates))
+    print_merge_report(report)
+
+    with open(args.resume, 'w', encoding='utf-8') as f:
+        json.dump(resume_data, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+mockLLMServer.py: Local OpenAI-compatible /chat/completions server with injected latency.
+
+Answers every request with the same deterministic content as the "stub" provider (the resume from the prompt
+echoed back in the expected "output" format), after a configurable delay. A fraction of requests can be made
+slow to reproduce the long tail that request hedging is meant to cut.
+
+Usage:
+    python3 mockLLMServer.py --port 8765 --latency 0.5 --slow-latency 20 --slow-rate 0.1
+
+Then point a provider at it in config.yml:
+    providers:
+      - name: mock
+        type: openai
+        endpoint: "http://127.0.0.1:8765/chat/completions"
+        model: mock
+    hedging:
+      enabled: true
+      initial_delay: 2.0
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llmProviders import stub_response
+
+class MockCompletionsHandler(BaseHTTPRequestHandler):
+    # Set by main() before the server starts.
+    latency = 0.0
+    slow_latency = 0.0
+    slow_rate = 0.0
+    rng = random.Random()
+    rng_lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError) as e:
+            self.send_json(400, {"error": f"Malformed request: {e}"})
+            return
+
+        with self.rng_lock:
+            slow = self.rng.random() < self.slow_rate
+        delay = self.slow_latency if slow else self.latency
+        time.sleep(delay)
+
+        body = stub_response(prompt)
+        body["model"] = payload.get("model", "mock")
+        try:
+            self.send_json(200, body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on this request (e.g. a cancelled hedge loser).
+            pass
+        print(f"{'slow' if slow else 'fast'} response after {delay:.2f}s")
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock chat completions with injected latency.")
+    parser.add_argument('--host', default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument('--latency', type=float, default=0.2, help="Delay in seconds for normal responses")
+    parser.add_argument('--slow-latency', type=float, default=10.0, help="Delay in seconds for slow responses")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Fraction of responses that are slow (0-1)")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible slow responses")
+    args = parser.parse_args()
+
+    MockCompletionsHandler.latency = args.latency
+    MockCompletionsHandler.slow_latency = args.slow_latency
+    MockCompletionsHandler.slow_rate = args.slow_rate
+    MockCompletionsHandler.rng = random.Random(args.seed)
+
+    server = ThreadingHTTPServer((args.host, args.port), MockCompletionsHandler)
+    server.daemon_threads = True
+    print(f"Mock completions server on http://{args.host}:{args.port}/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
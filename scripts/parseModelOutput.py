@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+parseModelOutput.py: Tolerant parser for the tailored resume returned by the LLM.
+
+Instead of a regex over a ```json block followed by a strict json.loads, the reply is handled in one pass:
+  1. Skip to the code fence if there is one and locate the outermost JSON object by bracket scanning
+     (string-aware), so commentary before or after the object is ignored.
+  2. Repair common defects: // # /* */ comments, trailing commas, raw newlines inside strings, Python
+     literals (True/False/None), and brackets or strings left open by a truncated reply.
+  3. Accept either {"output": {...}} or a bare "output": {...} / {...} object, then validate each section
+     (summary, work, projects, skills) against the expected shape, and check that work and projects return
+     every entry that was sent.
+
+If the object as a whole cannot be read, each section is salvaged independently. Sections that are still
+missing or invalid are reported so the caller can send a small repair prompt for just those sections
+(see build_repair_prompt) instead of re-generating the whole resume; that prompt carries the section's resume
+input and the job description, since the repair is a new request with no memory of the first one.
+
+Usage:
+    python3 parseModelOutput.py --input <raw_model_reply.txt>
+"""
+
+import re
+import json
+import argparse
+
+OUTPUT_SECTIONS = ("summary", "work", "projects", "skills")
+
+# Shapes quoted back to the model in repair prompts.
+SECTION_FORMATS = {
+    "summary": '{"summary": "<tailored summary, 50-150 words>"}',
+    "work": '{"work": [{"id": "<id>", "company": "<company>", "highlights": ["<bullet>", "..."]}]}',
+    "projects": '{"projects": [{"id": "<id>", "name": "<name>", "highlights": ["<bullet>", "..."]}]}',
+    "skills": '{"skills": [{"<Category name>": "<skill>, <skill>, <skill>"}]}',
+}
+
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+def strip_code_fence(text):
+    match = re.search(r"```(?:json|JSON)?[ \t]*\n?", text)
+    return text[match.end():] if match else text
+
+def scan_value(text, start):
+    """Return the index just past the object/array opening at text[start], or None if it never closes."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+def drop_trailing_comma(out):
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+def repair_json(fragment):
+    out = []
+    closers = []
+    in_string = False
+    escaped = False
+    i = 0
+    n = len(fragment)
+    while i < n:
+        ch = fragment[i]
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(ch)
+            elif ch == "\\":
+                escaped = True
+                out.append(ch)
+            elif ch == '"':
+                in_string = False
+                out.append(ch)
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == "#" or fragment.startswith("//", i):
+            newline = fragment.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif fragment.startswith("/*", i):
+            end = fragment.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            drop_trailing_comma(out)
+            if closers:
+                closers.pop()
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            out.append(PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Close whatever a truncated reply left open.
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    drop_trailing_comma(out)
+    while closers:
+        out.append(closers.pop())
+        drop_trailing_comma(out)
+    return "".join(out)
+
+def loads_tolerant(fragment):
+    try:
+        return json.loads(fragment)
+    except ValueError:
+        return json.loads(repair_json(fragment))
+
+def extract_section(text, section):
+    """Return the raw JSON text of the value following "section": in text, or None."""
+    for match in re.finditer(r'"%s"\s*:\s*' % re.escape(section), text):
+        start = match.end()
+        if start >= len(text):
+            return None
+        if text[start] in "{[":
+            end = scan_value(text, start)
+            return text[start:end] if end else text[start:]
+        if text[start] == '"':
+            end = start + 1
+            while end < len(text):
+                if text[end] == "\\":
+                    end += 2
+                    continue
+                if text[end] == '"':
+                    return text[start:end + 1]
+                end += 1
+            return text[start:]
+    return None
+
+def validate_entries(entries, name_field):
+    if not isinstance(entries, list):
+        return f"expected a list, got {type(entries).__name__}"
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return f"entry {i} is not an object"
+        if "id" in entry and not isinstance(entry["id"], str):
+            return f"entry {i} has a non-text id"
+        if not entry.get("id") and not entry.get(name_field):
+            return f"entry {i} has neither an id nor a {name_field}"
+        highlights = entry.get("highlights")
+        if not isinstance(highlights, list) or not highlights:
+            return f"entry {i} has no highlights list"
+        if not all(isinstance(point, str) for point in highlights):
+            return f"entry {i} has non-text highlights"
+    return None
+
+def validate_section(section, value):
+    """Return an error message when value does not have the shape expected for section, else None."""
+    if section == "summary":
+        if not isinstance(value, str) or not value.strip():
+            return "expected a non-empty string"
+        return None
+    if section == "work":
+        return validate_entries(value, "company")
+    if section == "projects":
+        return validate_entries(value, "name")
+    if section == "skills":
+        if not isinstance(value, list) or not value:
+            return "expected a non-empty list"
+        for i, item in enumerate(value):
+            if not isinstance(item, dict) or not item:
+                return f"entry {i} is not a category object"
+            if not all(isinstance(skills, str) for skills in item.values()):
+                return f"entry {i} has non-text skills"
+        return None
+    return f"unknown section '{section}'"
+
+def missing_entries(section, value, my_resume):
+    """
+    Return an error message when a valid work/projects value leaves out entries of my_resume (the input the
+    request was built from), else None. An entry returned without an id still counts when its name matches.
+    """
+    name_field = {"work": "company", "projects": "name"}.get(section)
+    if name_field is None or my_resume is None:
+        return None
+    returned_ids = {entry.get("id") for entry in value}
+    returned_names = {entry.get(name_field) for entry in value if not entry.get("id")}
+    missing = [
+        entry.get("id") or entry.get(name_field) or "<unnamed>"
+        for entry in section_input(my_resume, section)
+        if entry.get("id") not in returned_ids and entry.get(name_field) not in returned_names
+    ]
+    if missing:
+        return f"missing entries: {', '.join(map(str, missing))}"
+    return None
+
+def parse_model_output(content, my_resume=None):
+    """
+    Parse a model reply into its "output" sections.
+    Returns (output, errors): output holds only the sections that parsed and validated,
+    errors maps every missing or invalid section to a message.
+    With my_resume (the input the prompt was built from), a work or projects section that drops entries
+    is an error too.
+    """
+    text = strip_code_fence(content)
+    document = None
+    start = text.find("{")
+    if start != -1:
+        end = scan_value(text, start)
+        try:
+            document = loads_tolerant(text[start:end] if end else text[start:])
+        except ValueError:
+            document = None
+
+    output = None
+    if isinstance(document, dict):
+        if isinstance(document.get("output"), dict):
+            output = document["output"]
+        elif any(section in document for section in OUTPUT_SECTIONS):
+            # A bare "output": {...} reply: the first object found is the output itself.
+            output = document
+
+    errors = {}
+    if output is None:
+        # The object as a whole is unreadable: salvage each section on its own.
+        output = {}
+        for section in OUTPUT_SECTIONS:
+            fragment = extract_section(text, section)
+            if fragment is None:
+                continue
+            try:
+                output[section] = loads_tolerant(fragment)
+            except ValueError as e:
+                errors[section] = f"invalid JSON: {e}"
+
+    valid = {}
+    for section in OUTPUT_SECTIONS:
+        if section in errors:
+            continue
+        if section not in output:
+            errors[section] = "missing"
+            continue
+        error = validate_section(section, output[section]) or missing_entries(section, output[section], my_resume)
+        if error:
+            errors[section] = error
+        else:
+            valid[section] = output[section]
+    return valid, errors
+
+def section_input(my_resume, section):
+    # The part of the resume the model tailors into this output section.
+    if section == "summary":
+        return my_resume.get("basics", {}).get("summary", "")
+    return my_resume.get(section, [])
+
+def build_repair_prompt(section, content, error, my_resume, job_description):
+    """
+    Build a self-contained prompt that regenerates one section. The repair is a fresh request, so it carries
+    that section's resume input (with its ids) and the job description; the broken reply is quoted only as
+    a reference.
+    """
+    fragment = extract_section(strip_code_fence(content), section)
+    broken = fragment if fragment is not None else "(the section was missing from the reply)"
+    source = json.dumps(section_input(my_resume, section), indent=2, ensure_ascii=False)
+    return f"""You are tailoring one section of my resume to a job description. An earlier reply returned an invalid "{section}" section ({error}).
+    This is what it returned, for reference only:
+    {broken}
+
+    Here is the original "{section}" section of my resume:
+    {section} = {source}
+
+    Here is the job description:
+    job_description = {job_description}
+
+    Rewrite the "{section}" section, tailored to the job description with its keywords, and return ONLY a JSON object for this one section, inside a ```json code block, in exactly this format:
+    {SECTION_FORMATS[section]}
+    Return every entry given above, keeping each "id", "company" and "name" value exactly as given, and do not add entries that are not in it. Do not add explanations or any other sections.
+    """
+
+def parse_repair_reply(section, content, my_resume=None):
+    """
+    Return the repaired value for section from a reply to build_repair_prompt, or None if still invalid
+    (including, with my_resume, when it still drops entries).
+    """
+    text = strip_code_fence(content)
+    value = None
+    start = text.find("{")
+    if start != -1:
+        end = scan_value(text, start)
+        try:
+            document = loads_tolerant(text[start:end] if end else text[start:])
+        except ValueError:
+            document = None
+        if isinstance(document, dict):
+            value = document.get(section)
+    if value is None:
+        fragment = extract_section(text, section)
+        if fragment is not None:
+            try:
+                value = loads_tolerant(fragment)
+            except ValueError:
+                return None
+    if value is None or validate_section(section, value) or missing_entries(section, value, my_resume):
+        return None
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse and validate a raw model reply.")
+    parser.add_argument('--input', required=True, help="Path to a text file holding the raw model reply")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    output, errors = parse_model_output(content)
+    print(json.dumps({"output": output}, indent=4, ensure_ascii=False))
+    for section, error in errors.items():
+        print(f"❌ {section}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+streamJobDescriptions.py: Streams job descriptions from a directory or a large corpus file, one at a time.
+
+Batch sources can hold millions of postings, so nothing here builds a list of them:
+  - a directory is walked with os.scandir and each .txt file is used in place;
+  - a .jsonl or .csv corpus is memory-mapped and decoded line by line, so the operating system pages the
+    file in and out instead of the process holding it.
+
+The pipeline reads each job description from a file, so every corpus record is written to a small spool
+file just before it is used. The caller deletes that file once the job's artifacts are written, so memory stays
+flat however large the corpus is, and spool disk usage grows only with the number of jobs in flight (queued
+but not yet finished, or failed and kept for a retry).
+
+Usage:
+    python3 streamJobDescriptions.py --source postings.jsonl --text-field description --id-field id
+"""
+
+import os
+import re
+import csv
+import json
+import mmap
+import hashlib
+import argparse
+
+# Pages already read are dropped from the mapping every this many bytes, so resident memory stays flat too.
+RELEASE_EVERY = 16 << 20
+
+def iter_lines(file_path):
+    """Yield the decoded lines of a file, reading it through a memory map."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # madvise is not available on every platform (e.g. Windows); reading works the same without it.
+            can_release = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for line in iter(mapped.readline, b""):
+                yield line.decode("utf-8-sig" if mapped.tell() == len(line) else "utf-8")
+                if can_release and mapped.tell() - released >= RELEASE_EVERY:
+                    consumed = mapped.tell() - mapped.tell() % mmap.PAGESIZE
+                    mapped.madvise(mmap.MADV_DONTNEED, released, consumed - released)
+                    released = consumed
+
+def record_name(value, number):
+    # Record ids become file and folder names, so keep only filename-safe characters.
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(value)).strip("._") if value not in (None, "") else ""
+    return name or f"{number:06d}"
+
+def iter_jsonl(file_path, text_field="description", id_field="id"):
+    """Yield (name, text) for every JSON Lines record that has a non-empty text field."""
+    for number, line in enumerate(iter_lines(file_path), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"⚠️ Skipping line {number} of {file_path}: {e}")
+            continue
+        text = record.get(text_field) if isinstance(record, dict) else None
+        if isinstance(text, str) and text.strip():
+            yield record_name(record.get(id_field), number), text
+
+def iter_csv(file_path, text_field="description", id_field="id"):
+    """Yield (name, text) for every CSV row (with a header row) that has a non-empty text column."""
+    reader = csv.DictReader(iter_lines(file_path))
+    if reader.fieldnames is None or text_field not in reader.fieldnames:
+        print(f"❌ {file_path} has no '{text_field}' column.")
+        return
+    for number, row in enumerate(reader, 1):
+        text = row.get(text_field)
+        if text and text.strip():
+            yield record_name(row.get(id_field), number), text
+
+def iter_directory(dir_path):
+    """Yield (name, path) for every .txt file in a directory, in directory order."""
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".txt") and entry.is_file():
+                yield os.path.splitext(entry.name)[0], entry.path
+
+def spool_record(spool_dir, name, data):
+    path = os.path.join(spool_dir, f"{name}.txt")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+def is_corpus(source):
+    """True if source is a corpus file whose records are spooled, rather than files used in place."""
+    return not os.path.isdir(source) and os.path.splitext(source)[1].lower() in (".jsonl", ".ndjson", ".csv")
+
+def stream_job_descriptions(source, spool_dir, text_field="description", id_field="id"):
+    """
+    Yield (name, path, spooled) for every job description in source (a directory, .jsonl or .csv file).
+    spooled is True when path is a spool file written for a corpus record, which the caller should delete
+    once the job's artifacts are written. Corpus record names end in a hash of the posting text, since two
+    records can share an id (or ids that sanitise to the same name) and would otherwise share output files.
+    """
+    if os.path.isdir(source):
+        for name, path in iter_directory(source):
+            yield name, path, False
+        return
+
+    extension = os.path.splitext(source)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        records = iter_jsonl(source, text_field, id_field)
+    elif extension == ".csv":
+        records = iter_csv(source, text_field, id_field)
+    elif extension == ".txt":
+        yield os.path.splitext(os.path.basename(source))[0], source, False
+        return
+    else:
+        raise ValueError(f"Unsupported job description source: {source} (expected a directory, .jsonl or .csv)")
+
+    os.makedirs(spool_dir, exist_ok=True)
+    for name, text in records:
+        data = text.encode("utf-8")
+        name = f"{name}_{hashlib.sha256(data).hexdigest()[:12]}"
+        yield name, spool_record(spool_dir, name, data), True
+
+def release(path, spooled):
+    # Drop a spooled job description once nothing needs it any more.
+    if spooled:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the job descriptions in a source and report peak memory.")
+    parser.add_argument('--source', required=True, help="Directory of .txt files, or a .jsonl / .csv corpus")
+    parser.add_argument('--text-field', default="description", help="Field holding the posting text (default: description)")
+    parser.add_argument('--id-field', default="id", help="Field used to name each job (default: id)")
+    parser.add_argument('--spool', default=os.path.join("store", "jd_spool"),
+                        help="Directory for spooled corpus records (default: store/jd_spool)")
+    args = parser.parse_args()
+
+    # Only this report needs tracemalloc; the pipeline imports the module without it.
+    import tracemalloc
+    tracemalloc.start()
+    count = 0
+    total_bytes = 0
+    for name, path, spooled in stream_job_descriptions(args.source, args.spool, args.text_field, args.id_field):
+        count += 1
+        total_bytes += os.path.getsize(path)
+        release(path, spooled)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{count} job description(s), {total_bytes / 1e6:.1f} MB of text, "
+          f"peak Python memory {peak / 1e6:.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+watchFiles.py: Polls a small set of files for changes and reports them once edits settle.
+
+Only a handful of data files are watched, so a stat() poll every fraction of a second is cheap and works the
+same on every platform and editor (including editors that save by replacing the file). A change is reported
+only after the files have been quiet for the debounce period, so one save that touches a file several times
+triggers a single rebuild.
+
+Usage:
+    python3 watchFiles.py data/resume.yaml data/resume.tex data/resume.cls
+"""
+
+import os
+import time
+import argparse
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def snapshot(paths):
+    return {path: file_signature(path) for path in paths}
+
+def watch_files(paths, interval=0.2, debounce=0.3):
+    """Yield the set of paths that changed, once no further change has been seen for debounce seconds."""
+    previous = snapshot(paths)
+    changed = set()
+    last_change = None
+    while True:
+        time.sleep(interval)
+        current = snapshot(paths)
+        for path in paths:
+            if current[path] != previous[path]:
+                changed.add(path)
+                last_change = time.monotonic()
+        previous = current
+        if changed and time.monotonic() - last_change >= debounce:
+            yield changed
+            # Edits saved while the caller was rebuilding are picked up by the next poll.
+            changed = set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Print files as they change.")
+    parser.add_argument('paths', nargs='+', help="Files to watch")
+    parser.add_argument('--interval', type=float, default=0.2, help="Polling interval in seconds (default: 0.2)")
+    parser.add_argument('--debounce', type=float, default=0.3, help="Quiet period before reporting (default: 0.3)")
+    args = parser.parse_args()
+
+    try:
+        for changed in watch_files(args.paths, args.interval, args.debounce):
+            print("Changed: " + ", ".join(sorted(changed)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()